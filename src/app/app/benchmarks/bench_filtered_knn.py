@@ -0,0 +1,128 @@
+"""
+Compare the legacy post-filtered k-NN recommendation query with the filtered
+k-NN query, post by post, on latency and recall.
+
+The ground truth of a post is the exact (brute force) top-k of the formations
+of its department, computed with a `script_score` query. Recall is the share
+of that top-k returned by each query.
+
+Usage (from the app directory, with the OpenSearch credentials in the env):
+    python benchmarks/bench_filtered_knn.py --n-posts 50 --k 100
+"""
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+LEGACY_K = 350
+
+
+def legacy_query(post: dict, size: int, cols: list) -> dict:
+    search_case = [{"knn": {"vector_index": {
+        "vector": post["vector_index"], "k": LEGACY_K}}}]
+    if post["number_departement"] is not None:
+        search_case.insert(
+            0, {"prefix": {"cp": {"value": post["number_departement"]}}})
+    return {"size": size, "_source": cols, "query": {"bool": {"must": search_case}}}
+
+
+def exact_query(post: dict, k: int) -> dict:
+    query = {"match_all": {}}
+    if post["number_departement"] is not None:
+        query = {"prefix": {"cp": {"value": post["number_departement"]}}}
+    return {
+        "size": k,
+        "_source": False,
+        "query": {"script_score": {
+            "query": query,
+            "script": {
+                "source": "knn_score",
+                "lang": "knn",
+                "params": {
+                    "field": "vector_index",
+                    "query_value": post["vector_index"],
+                    "space_type": "cosinesimil"
+                }
+            }
+        }}
+    }
+
+
+def run_query(db, index: str, body: dict, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = db.search(body=body, index=index)
+        timings.append((time.perf_counter() - start) * 1000)
+    return [h["_id"] for h in response["hits"]["hits"]], statistics.median(timings)
+
+
+def recall(found: list, truth: list) -> float:
+    if not truth:
+        return 1.
+    return len(set(found) & set(truth)) / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-posts", type=int, default=50)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from pandas import DataFrame
+    from components.page_2.session_manager import ManagerPage2
+    from utils.sender import SenderVectorDB
+
+    manager = ManagerPage2(data_post=DataFrame())
+    formations_db = SenderVectorDB(env_name_index="INDEX_FORMATION")
+    posts_db = SenderVectorDB(env_name_index="INDEX_POST")
+    index = formations_db.index_name_db
+    posts = []
+    for hit in posts_db.iter_hits(
+            cols=["title", "number_departement", "vector_index"]):
+        posts.append(hit["_source"])
+        if len(posts) == args.n_posts:
+            break
+
+    rows = []
+    for post in posts:
+        post.setdefault("number_departement", None)
+        truth, _ = run_query(formations_db.db, index, exact_query(post, args.k), 1)
+        legacy_ids, legacy_ms = run_query(
+            formations_db.db, index,
+            legacy_query(post, args.k, manager.col_formation_db), args.repeat)
+        filtered_ids, filtered_ms = run_query(
+            formations_db.db, index,
+            manager.build_recommandation_query(post, k=args.k), args.repeat)
+        rows.append({
+            "departement": post["number_departement"],
+            "truth": len(truth),
+            "legacy_hits": len(legacy_ids),
+            "legacy_ms": legacy_ms,
+            "legacy_recall": recall(legacy_ids, truth),
+            "filtered_hits": len(filtered_ids),
+            "filtered_ms": filtered_ms,
+            "filtered_recall": recall(filtered_ids, truth)
+        })
+
+    print(f"{'dep':>4} {'truth':>5} | {'legacy hits':>11} {'ms':>7} {'recall':>6} | "
+          f"{'filtered hits':>13} {'ms':>7} {'recall':>6}")
+    for r in rows:
+        print(f"{str(r['departement']):>4} {r['truth']:5d} | "
+              f"{r['legacy_hits']:11d} {r['legacy_ms']:7.1f} {r['legacy_recall']:6.2f} | "
+              f"{r['filtered_hits']:13d} {r['filtered_ms']:7.1f} {r['filtered_recall']:6.2f}")
+    if rows:
+        for name in ["legacy", "filtered"]:
+            print(
+                f"{name:>8}: median {statistics.median(r[f'{name}_ms'] for r in rows):.1f} ms, "
+                f"mean recall@{args.k} {statistics.mean(r[f'{name}_recall'] for r in rows):.3f}, "
+                f"{sum(r[f'{name}_hits'] == 0 and r['truth'] > 0 for r in rows)} posts without results"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -240,12 +240,12 @@ class ManagerPage1:
             logger.error("Unexpected type for post.tasks")
             raise ValueError(f"Unexpected type for post.tasks: {type(post.tasks)}")
 
-    def get_to_raw_id(self) -> None:
+    def get_to_raw_id(self) -> list:
         """
-        Sends post data to a vectorial database for indexing.
+        Retrieves the raw IDs of all posts already sent to the vectorial database.
 
-        Args:
-            cols (list): A list of columns to include when sending data to the database.
+        Returns:
+            list: The raw IDs of every post in the index, streamed page by page.
         """
         vectorial_db = get_vectorial_db(
             env_name_index="INDEX_POST",
@@ -253,8 +253,10 @@ class ManagerPage1:
             other_cols=["raw_id"]
         )
         if vectorial_db.index_exists():
-            df = vectorial_db.get_data()
-            return df["raw_id"].astype(int).to_list()
+            return list({
+                int(hit["_source"]["raw_id"])
+                for hit in vectorial_db.iter_hits(cols=["raw_id"])
+            })
         else:
             return []
 
@@ -17,6 +17,7 @@ class ManagerPage2:
         data_storage (dict): Stores session data for posts and their associated formations.
         all_mail_content (dict): Stores email content for each responsible person.
         data_post (DataFrame): The DataFrame containing the post data.
+        k_recommandation (int): Number of formations recommended for a post.
     """
 
     col_formation_db = [
@@ -29,6 +30,7 @@ class ManagerPage2:
         'updated_at', 'number_departement',
         'tasks', 'status'
     ]
+    k_recommandation = 100
 
     def __init__(self, data_post: DataFrame,
                  col_post_db: list = None, col_formation_db: list = None,
@@ -128,6 +130,45 @@ class ManagerPage2:
         """
         return self.data_post.to_dict(orient="records")
 
+    def build_recommandation_query(self, post: dict, k: int = None) -> dict:
+        """
+        Builds the filtered k-NN query recommending formations for a post.
+
+        The department restriction is passed as the `filter` of the k-NN clause,
+        so it is applied while the HNSW graph is searched instead of on the
+        `k` neighbours already retrieved: posts in small departments still get
+        up to `k` formations, and `k` does not need to be oversized.
+
+        Args:
+            post (dict): Data of the post with its vector and department.
+            k (int, optional): Number of formations to retrieve.
+                Defaults to `k_recommandation`.
+
+        Returns:
+            dict: Body of the search request.
+        """
+        k = k or self.k_recommandation
+        knn = {
+            "vector": post["vector_index"],
+            "k": k
+        }
+        if not isinstance(post["number_departement"], type(None)):
+            knn["filter"] = {
+                "prefix": {"cp": {"value": post["number_departement"]}}
+            }
+        else:
+            title = post.get("title")
+            logger.warning(f"No departement found for post: {title}")
+        return {
+            "size": k,
+            "_source": self.col_formation_db,
+            "query": {
+                "knn": {
+                    "vector_index": knn
+                }
+            }
+        }
+
     def get_recommandation_formation_from_in_vectorial_db(self, post: dict, formations_db) -> DataFrame:
         """
         Retrieves recommended formations for a given post from the vectorial database.
@@ -139,37 +180,8 @@ class ManagerPage2:
         Returns:
             DataFrame: DataFrame containing the recommended formations.
         """
-        if not isinstance(post["number_departement"], type(None)):
-            search_case = [
-                {"prefix": {"cp": {"value": post["number_departement"]}}},
-                {"knn": {
-                    "vector_index": {
-                        "vector": post["vector_index"],
-                        "k": 350
-                    }
-                }}
-            ]
-        else:
-            search_case = [
-                {"knn": {
-                    "vector_index": {
-                        "vector": post["vector_index"],
-                        "k": 350
-                    }
-                }}
-            ]
-            title = post["title"]
-            logger.warning(f"No departement found for post: {title}")
         return formations_db.get_data(
-            settings_index={
-                "size": 100,
-                "_source": self.col_formation_db,
-                "query": {
-                    "bool": {
-                        "must": search_case
-                    }
-                }
-            }
+            settings_index=self.build_recommandation_query(post)
         )
 
     def get_templates_mail(self):
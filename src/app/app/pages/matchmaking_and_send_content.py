@@ -22,8 +22,10 @@ if "manager" not in st.session_state or (st.session_state.page != 2):
         env_name_index="INDEX_POST",
         other_cols=SessionManager.col_post_db
     )
-    data_post = st.session_state.post_db.get_data()
-    data_post = data_post[data_post.status == "FORMATTED"]
+    data_post = st.session_state.post_db.get_all_data(
+        query={"match": {"status": "FORMATTED"}},
+        with_vectors=True
+    )
     st.session_state.manager = SessionManager(
         data_post=data_post
     )
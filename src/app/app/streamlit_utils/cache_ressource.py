@@ -1,7 +1,9 @@
 from utils.sender import SenderVectorDB
+from utils.numpy_sender import NumpyVectorDB
 from utils.drive_manager import DriveManager
 import streamlit as st
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +14,11 @@ def get_vectorial_db(
     index_col: str,
     other_cols: list
 ):
+    sender_class = SenderVectorDB
+    if os.environ.get("VECTOR_DB_BACKEND", "opensearch") == "numpy":
+        sender_class = NumpyVectorDB
     try:
-        return SenderVectorDB(
+        return sender_class(
             env_name_index=env_name_index,
             index_col=index_col,
             other_cols=other_cols
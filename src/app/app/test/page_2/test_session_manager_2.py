@@ -129,4 +129,31 @@ def test_get_recommandation_formation_from_in_vectorial_db(session_manager):
 
     mock_formations_db.get_data.assert_called_once()
     assert isinstance(result, DataFrame)
-    assert "nom_formation" in result.columns
\ No newline at end of file
+    assert "nom_formation" in result.columns
+
+def test_build_recommandation_query_filters_inside_knn(session_manager):
+    post = {
+        "number_departement": "75",
+        "vector_index": [0.1, 0.2, 0.3]
+    }
+
+    body = session_manager.build_recommandation_query(post, k=20)
+
+    knn = body["query"]["knn"]["vector_index"]
+    assert knn["k"] == 20
+    assert body["size"] == 20
+    assert knn["filter"] == {"prefix": {"cp": {"value": "75"}}}
+
+
+def test_build_recommandation_query_without_departement(session_manager):
+    post = {
+        "number_departement": None,
+        "title": "Title 1",
+        "vector_index": [0.1, 0.2, 0.3]
+    }
+
+    body = session_manager.build_recommandation_query(post)
+
+    knn = body["query"]["knn"]["vector_index"]
+    assert "filter" not in knn
+    assert knn["k"] == session_manager.k_recommandation
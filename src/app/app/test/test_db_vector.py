@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from utils.db_vector import DBVector
+from utils.db_vector import DBVector, DEFAULT_CLIENT_OPTIONS, get_client
 
 
 def test_dbvector_initialization_success(mocker):
@@ -50,3 +50,28 @@ def test_get_db_failure(mocker):
 
     client = db_vector.get_db()
     assert client is None
+
+
+def test_get_client_shared_by_settings(mocker, monkeypatch):
+    """Test that clients are created once per connection settings."""
+    mocker.patch.dict("utils.db_vector._clients", clear=True)
+    mock_opensearch = mocker.patch(
+        "utils.db_vector.OpenSearch", side_effect=lambda **kwargs: MagicMock())
+    monkeypatch.setenv("HOST_DB_VECTOR", "[{'host': 'localhost', 'port': 9200}]")
+    monkeypatch.setenv("OPTION_DB_VECTOR", "{'use_ssl': True}")
+
+    first = get_client()
+    assert get_client() is first
+    other = get_client(option_db={"use_ssl": False})
+    assert other is not first
+    assert mock_opensearch.call_count == 2
+    kwargs = mock_opensearch.call_args_list[0].kwargs
+    assert kwargs["use_ssl"] is True
+    assert kwargs["http_compress"] is True
+    assert kwargs["pool_maxsize"] == DEFAULT_CLIENT_OPTIONS["pool_maxsize"]
+
+
+def test_get_client_invalid_settings():
+    """Test that malformed settings are rejected."""
+    with pytest.raises(ValueError):
+        get_client(option_host={"host": "localhost"}, option_db={})
@@ -0,0 +1,51 @@
+import pytest
+import conf_test
+import numpy as np
+import pandas as pd
+from utils.numpy_sender import NumpyVectorDB
+
+
+@pytest.fixture
+def post_db(tmp_path):
+    """Fixture to initialize a NumpyVectorDB of posts."""
+    return NumpyVectorDB(
+        path=tmp_path, env_name_index="INDEX_POST",
+        index_col="id", other_cols=["id", "title", "status"]
+    )
+
+
+@pytest.fixture
+def posts():
+    return pd.DataFrame({
+        "id": ["p1", "p2"],
+        "title": ["Post 1", "Post 2"],
+        "status": ["FORMATTED", "FORMATTED"],
+        "vector_index": [np.array([1., 0.]), np.array([0., 1.])]
+    })
+
+
+def test_send_and_update(post_db, posts):
+    """Test that posts are stored once and their status can be updated."""
+    post_db.send_data(posts)
+    post_db.send_data(posts)
+    assert post_db.get_all_id_data() == {"p1", "p2"}
+    post_db.update_data(id_doc="p1", params={"doc": {"status": "SENDED"}})
+    formatted = post_db.get_all_data(query={"match": {"status": "FORMATTED"}}, with_vectors=True)
+    assert formatted["id"].to_list() == ["p2"]
+    np.testing.assert_allclose(formatted["vector_index"][0], [0., 1.])
+
+
+def test_search_knn(post_db, posts):
+    """Test the exact top-k search with a filter."""
+    post_db.send_data(posts)
+    hits, = post_db.search_knn([0.9, 0.1], k=2, query={"term": {"status": "FORMATTED"}})
+    assert [h["_id"] for h in hits] == ["p1", "p2"]
+    assert "vector_index" not in hits[0]["_source"]
+
+
+def test_instances_share_store(post_db, posts, tmp_path):
+    """Test that a reader instance sees the posts sent through another instance."""
+    reader = NumpyVectorDB(
+        path=tmp_path, env_name_index="INDEX_POST", index_col="id", other_cols=["raw_id"])
+    post_db.send_data(posts)
+    assert reader.get_all_id_data() == {"p1", "p2"}
@@ -1,9 +1,13 @@
 import pytest
 import conf_test
-from unittest.mock import patch
-from sentence_transformers import SentenceTransformer
+from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
+import types
+import sys
 from utils.sender import SenderVectorDB
+from utils import model_registry
+from utils.model_registry import LazyModel
 
 
 @pytest.fixture
@@ -23,7 +27,28 @@ def vector_db(mock_environment_variables):
 def test_initialization(vector_db):
     """Test class initialization with environment variables."""
     assert vector_db.index_name_db == "test_index"
-    assert isinstance(vector_db.model, SentenceTransformer)
+    assert isinstance(vector_db.model, LazyModel)
+
+
+def test_model_loaded_lazily_and_shared(monkeypatch):
+    """Test that the model is loaded on first encode, once per process."""
+    loaded = []
+
+    class FakeModel:
+        def __init__(self, name, **kwargs):
+            loaded.append(name)
+
+        def encode(self, texts, **kwargs):
+            return np.zeros((len(texts), 2))
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=FakeModel))
+    monkeypatch.setattr(model_registry, "_models", {})
+    model = LazyModel("fake-model")
+    assert loaded == []
+    model.encode(["a"])
+    LazyModel("fake-model").encode(["b"])
+    assert loaded == ["fake-model"]
 
 
 def test_add_vector(vector_db):
@@ -35,18 +60,59 @@ def test_add_vector(vector_db):
     assert len(result_df["vector_index"][0]) == vector_db.vector_dim
 
 
+def test_add_vector_batched(vector_db):
+    """Test that add_vector encodes the whole column in one batched call."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.ones((2, 4), dtype=np.float64)
+    df = pd.DataFrame({"text_column": ["A", "B"]})
+    result_df = vector_db.add_vector(df, "text_column", batch_size=8)
+    args, kwargs = vector_db.model.encode.call_args
+    assert args[0] == ["a", "b"]
+    assert kwargs["batch_size"] == 8
+    assert result_df["vector_index"][0].dtype == np.float32
+
+
+def test_add_vector_deduplicates(vector_db):
+    """Test that identical texts are encoded once and broadcast to their rows."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.array([[1., 0.], [0., 1.]])
+    df = pd.DataFrame({"text_column": ["Math", "Info", "math", "Math"]})
+    result_df = vector_db.add_vector(df, "text_column")
+    assert vector_db.model.encode.call_args[0][0] == ["math", "info"]
+    assert [v[0] for v in result_df["vector_index"]] == [1., 0., 1., 1.]
+
+
+def test_add_vector_normalized_storage(mock_environment_variables, monkeypatch):
+    """Test that VECTOR_STORAGE selects normalized vectors and an innerproduct field."""
+    monkeypatch.setenv("VECTOR_STORAGE", "normalized")
+    vector_db = SenderVectorDB(env_name_index="TEST_INDEX")
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.array([[3., 4.]])
+    result_df = vector_db.add_vector(pd.DataFrame({"text_column": ["A"]}), "text_column")
+    np.testing.assert_allclose(result_df["vector_index"][0], [0.6, 0.8])
+    vector_db.db = MagicMock()
+    vector_db.db.indices.exists.return_value = False
+    vector_db.create_index()
+    body = vector_db.db.indices.create.call_args.kwargs["body"]
+    assert body["mappings"]["properties"]["vector_index"]["space_type"] == "innerproduct"
+
+
 @patch("opensearchpy.OpenSearch")
 def test_get_all_id_data(mock_opensearch, vector_db):
-    """Test retrieval of all IDs from the OpenSearch index."""
-    mock_response = {
-        "hits": {
-            "hits": [{"_source": {"id": "123"}}, {"_source": {"id": "456"}}]
-        }
-    }
-    mock_opensearch.return_value.search.return_value = mock_response
+    """Test that all IDs are streamed page by page on a point in time."""
+    db = mock_opensearch.return_value
+    db.create_pit.return_value = {"pit_id": "pit"}
+    db.search.side_effect = [
+        {"hits": {"hits": [{"_id": "123", "sort": ["123"]}]}},
+        {"hits": {"hits": [{"_id": "456", "sort": ["456"]}]}},
+        {"hits": {"hits": []}}
+    ]
     vector_db.db = mock_opensearch()
+    vector_db.scroll_size = 1
     ids = vector_db.get_all_id_data()
-    assert ids == ["123", "456"]
+    assert ids == {"123", "456"}
+    assert db.search.call_args.kwargs["body"]["search_after"] == ["456"]
+    db.delete_pit.assert_called_once_with(body={"pit_id": ["pit"]})
 
 
 @patch("opensearchpy.OpenSearch")
@@ -67,6 +133,40 @@ def test_get_data(mock_opensearch, vector_db):
     assert "nom_formation" in df.columns
 
 
+@patch("opensearchpy.OpenSearch")
+def test_iter_data_walks_whole_index(mock_opensearch, vector_db):
+    """Test that every page is read, chunked, and bounded by the memory budget."""
+    def page(start, n=2):
+        return {"hits": {"hits": [
+            {"_source": {"id": str(i)}, "sort": [str(i)]} for i in range(start, start + n)
+        ]}}
+    db = mock_opensearch.return_value
+    vector_db.db = mock_opensearch()
+    db.search.side_effect = [page(0, 3), page(3, 1)]
+    chunks = list(vector_db.iter_data(chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 1]
+
+    db.search.side_effect = [page(0), page(2), page(4, 0)]
+    assert vector_db.get_all_data(chunk_size=2)["id"].to_list() == ["0", "1", "2", "3"]
+
+    db.search.side_effect = [page(0), page(2), page(4, 0)]
+    with pytest.raises(MemoryError):
+        vector_db.get_all_data(chunk_size=2, max_bytes=1)
+
+
+@patch("opensearchpy.OpenSearch")
+def test_get_data_excludes_vectors(mock_opensearch, vector_db):
+    """Test that vectors are only returned when explicitly requested."""
+    mock_opensearch.return_value.search.return_value = {"hits": {"hits": []}}
+    vector_db.db = mock_opensearch()
+    vector_db.get_data()
+    body = mock_opensearch.return_value.search.call_args.kwargs["body"]
+    assert body["_source"] == {"excludes": ["vector_index"]}
+    vector_db.get_data(settings_index={"query": {"match_all": {}}}, with_vectors=True)
+    body = mock_opensearch.return_value.search.call_args.kwargs["body"]
+    assert "_source" not in body
+
+
 @patch("opensearchpy.OpenSearch")
 def test_create_index(mock_opensearch, vector_db):
     """Test creation of an OpenSearch index with proper settings."""
@@ -76,6 +176,25 @@ def test_create_index(mock_opensearch, vector_db):
     vector_db.create_index()
     mock_opensearch.return_value.indices.create.assert_called_once()
 
+
+@patch("opensearchpy.OpenSearch")
+def test_create_index_field_types(mock_opensearch, mock_environment_variables):
+    """Test that filter fields are mapped as keyword/date and prose as text."""
+    vector_db = SenderVectorDB(
+        env_name_index="TEST_INDEX",
+        other_cols=["raw_id", "content", "updated_at", "number_departement", "status"]
+    )
+    mock_opensearch.return_value.indices.exists.return_value = False
+    vector_db.db = mock_opensearch()
+    vector_db.create_index()
+    body = mock_opensearch.return_value.indices.create.call_args.kwargs["body"]
+    properties = body["mappings"]["properties"]
+    assert properties["raw_id"] == {"type": "keyword"}
+    assert properties["number_departement"] == {"type": "keyword"}
+    assert properties["status"] == {"type": "keyword"}
+    assert properties["updated_at"] == {"type": "date"}
+    assert properties["content"] == {"type": "text"}
+
 @patch("opensearchpy.OpenSearch")
 def test_send_data(mock_opensearch, vector_db):
     """Test sending data to the OpenSearch index."""
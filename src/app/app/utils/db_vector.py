@@ -1,10 +1,66 @@
 from opensearchpy import OpenSearch
+import ast
+import json
 import os
 import logging
+import threading
 import traceback
 
 logger = logging.getLogger(__name__)
 
+# Client settings applied unless OPTION_DB_VECTOR overrides them: a pool of
+# keep-alive connections per host, gzip bodies and retried timeouts.
+DEFAULT_CLIENT_OPTIONS = {
+    "http_compress": True,
+    "pool_maxsize": 20,
+    "timeout": 30,
+    "max_retries": 3,
+    "retry_on_timeout": True,
+}
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(option_host: list = None, option_db: dict = None) -> OpenSearch:
+    """
+    Return the process-wide OpenSearch client of a set of connection settings,
+    creating it on first use.
+
+    Clients are keyed by their settings, so every SenderVectorDB of the process
+    (and every Streamlit rerun and session) reuses the same connection pool,
+    sockets and TLS sessions.
+
+    Args:
+        option_host (list, optional): Hosts of the cluster. Defaults to the
+            HOST_DB_VECTOR environment variable.
+        option_db (dict, optional): Client options, merged over
+            `DEFAULT_CLIENT_OPTIONS`. Defaults to the OPTION_DB_VECTOR
+            environment variable.
+
+    Returns:
+        OpenSearch: The shared client.
+
+    Raises:
+        ValueError: If the settings are not a list of hosts and a dict of options.
+    """
+    if option_host is None:
+        option_host = ast.literal_eval(os.environ["HOST_DB_VECTOR"])
+    if option_db is None:
+        option_db = ast.literal_eval(os.environ["OPTION_DB_VECTOR"])
+    if not isinstance(option_db, dict) or not isinstance(option_host, list):
+        logger.error(option_db)
+        logger.error(option_host)
+        raise ValueError(
+            f"The type of option_db is {type(option_db)} and the type of option_host is {type(option_host)}")
+    options = {**DEFAULT_CLIENT_OPTIONS, **option_db}
+    key = json.dumps([option_host, options], sort_keys=True, default=repr)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = OpenSearch(hosts=option_host, **options)
+            logger.info(f"OpenSearch client created for {len(option_host)} host(s)")
+        return _clients[key]
+
 
 class DBVector:
     def __init__(self, option_host: list, option_db: dict):
@@ -0,0 +1,93 @@
+from pathlib import Path
+import logging
+import os
+import pandas as pd
+from utils.sender import SenderVectorDB
+from utils.numpy_store import get_store
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorDB(SenderVectorDB):
+    """
+    A SenderVectorDB keeping the index in a local NumPy store instead of an
+    OpenSearch cluster, for offline runs, CI and as a low-latency local copy.
+    Search is exact over normalized vectors (see `utils.numpy_store`), and
+    the instances of an index share one process-wide store.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        """
+        Initialize the backend, opening the store of the index.
+
+        :param path: Directory holding one store per index, defaults to the
+            VECTOR_DB_PATH env variable
+        :param kwargs: Arguments of `SenderVectorDB`
+        """
+        self.path = Path(path or os.environ.get("VECTOR_DB_PATH", "./data/vector_db"))
+        super().__init__(**kwargs)
+        self.store = get_store(self.path / self.index_name_db, vector_col=self.vector_col)
+
+    def connect(self):
+        return None
+
+    def index_exists(self) -> bool:
+        return self.store.exists()
+
+    def create_index(self):
+        """
+        Create the store of the index. If it already exists, it does nothing.
+        """
+        if not self.store.exists():
+            self.store.create(self.vector_dim)
+        else:
+            logger.info("Index already exists")
+
+    def iter_hits(self, cols=None, query: dict = None, size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream every hit of the store matching a query, see `SenderVectorDB.iter_hits`.
+        """
+        yield from self.store.hits(self.source_filter(cols, with_vectors), query)
+
+    def search(self, body: dict) -> list:
+        """
+        Run a search body against the store, see `NumpyStore.search_body`.
+        """
+        return self.store.search_body(body)
+
+    def search_knn(self, vectors, k: int, query: dict = None) -> list:
+        """
+        Exact filtered top-k search of one or several query vectors.
+
+        :param vectors: One query vector, or a matrix of them
+        :param k: Number of documents per query vector
+        :param query: Filter restricting the candidate documents
+        :return: For each query vector, the hits sorted by decreasing cosine similarity
+        """
+        return [
+            [self.store.hit(row, self.source_filter(), score) for row, score in results]
+            for results in self.store.search(vectors, k, query)
+        ]
+
+    def send_data(self, df: pd.DataFrame):
+        """
+        Write the documents whose ID is not in the store yet.
+
+        :param df: Input pandas DataFrame with vector and metadata columns
+        """
+        self.create_index()
+        self.store.refresh()
+        df = df[~df[self.index_col].isin(self.store.rows)]
+        if not df.empty:
+            self.store.upsert(
+                df[self.index_col].to_list(),
+                df[self.other_cols].to_dict(orient="records"),
+                df[self.vector_col].to_list()
+            )
+
+    def update_data(self, id_doc: str, params: dict):
+        try:
+            self.store.update(id_doc, params["doc"])
+        except KeyError:
+            logger.error(f"Cannot update numpy vector store: unknown document {id_doc}")
@@ -1,9 +1,16 @@
 from opensearchpy import OpenSearch
+from typing import TYPE_CHECKING
 import logging
 import os
-from sentence_transformers import SentenceTransformer
+import numpy as np
 import pandas as pd
 import traceback
+from utils.db_vector import get_client
+from utils.model_registry import LazyModel
+from utils.vector_storage import check_storage, knn_field, prepare_vectors
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +18,8 @@ logger = logging.getLogger(__name__)
 class SenderVectorDB:
     """
     A class to manage vector-based search indices in OpenSearch.
-    It uses sentence embeddings generated by a pre-trained SentenceTransformer model.
+    It uses sentence embeddings generated by a pre-trained SentenceTransformer model,
+    shared by the process and only loaded on the first encode.
     """
 
     vector_col = "vector_index"
@@ -22,13 +30,33 @@ class SenderVectorDB:
         "url_fiche_formation", "mail_responsables", "universite",
         "ville", "url"
     ]
-    model = SentenceTransformer("dangvantuan/sentence-camembert-base")
+    # Columns that are not prose: exact lookups for codes, IDs and status,
+    # range queries for timestamps. Any other column is mapped as text.
+    field_types = {
+        "id": "keyword",
+        "raw_id": "keyword",
+        "cp": "keyword",
+        "number_departement": "keyword",
+        "status": "keyword",
+        "url": "keyword",
+        "url_fiche_formation": "keyword",
+        "created_at": "date",
+        "updated_at": "date",
+    }
+    model_name = "dangvantuan/sentence-camembert-base"
+    model = LazyModel(model_name)
     vector_dim = 768
+    # Layout of the knn_vector field, see `utils.vector_storage`.
+    vector_storage = "float32"
+    batch_size = 64
+    scroll_size = 1000
+    pit_keep_alive = "1m"
+    max_data_bytes = 512 * 1024 * 1024
     index_name_db = "index"
 
     def __init__(self, vector_col: str = None, index_col: str = None,
-                 other_cols: list = None, model: SentenceTransformer = None,
-                 env_name_index: str = None):
+                 other_cols: list = None, model: "SentenceTransformer" = None,
+                 env_name_index: str = None, vector_storage: str = None):
         """
         Initialize the SenderVectorDB instance with optional overrides for configuration.
 
@@ -37,6 +65,8 @@ class SenderVectorDB:
         :param other_cols: List of additional metadata columns
         :param model: Custom SentenceTransformer model for embeddings
         :param env_name_index: Name in env of target index
+        :param vector_storage: Layout of the knn_vector field, defaults to the
+            VECTOR_STORAGE env variable
         """
         if vector_col is not None:
             self.vector_col = vector_col
@@ -50,83 +80,230 @@ class SenderVectorDB:
         if model is not None:
             self.model = model
 
+        vector_storage = vector_storage or os.environ.get("VECTOR_STORAGE")
+        if vector_storage is not None:
+            self.vector_storage = check_storage(vector_storage)
+
         if env_name_index in os.environ:
             self.index_name_db = os.environ[env_name_index]
 
+        self.db = self.connect()
+
+    def connect(self) -> OpenSearch:
+        """
+        Return the OpenSearch client shared by the process for the
+        OPTION_DB_VECTOR and HOST_DB_VECTOR settings.
+
+        :return: The OpenSearch client
+        """
         try:
-            option_db = eval(os.environ["OPTION_DB_VECTOR"])
-            option_host = eval(os.environ["HOST_DB_VECTOR"])
-            if isinstance(option_db, dict) and isinstance(option_host, list):
-                self.db = OpenSearch(
-                    hosts=option_host,
-                    **option_db
-                )
-            else:
-                logger.error(option_db)
-                logger.error(option_host)
-                raise ValueError(
-                    f"The type of option_db is {type(option_db)} and the type of option_host is {type(option_host)}")
+            return get_client()
         except RuntimeError as e:
             logger.critical(f"Failed to initialize database managers: {e}")
             raise
 
-    def add_vector(self, df, col):
+    def encode(self, texts: list, batch_size: int = None) -> np.ndarray:
+        """
+        Encode a list of texts in batches into a single embedding matrix.
+
+        :param texts: Texts to encode
+        :param batch_size: Number of texts per forward pass, defaults to `self.batch_size`
+        :return: Contiguous float32 matrix of shape (len(texts), vector_dim)
+        """
+        if len(texts) == 0:
+            return np.empty((0, self.vector_dim), dtype=np.float32)
+        vectors = self.model.encode(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    def add_vector(self, df, col, batch_size: int = None):
         """
         Generate sentence embeddings for a specified column and add them to the DataFrame.
+        Identical texts are encoded once and their vector is shared by their rows.
+        Vectors are normalized (and quantized) as required by `vector_storage`.
 
         :param df: Input pandas DataFrame
         :param col: Column name containing text to encode into vectors
+        :param batch_size: Number of texts per forward pass
         :return: Updated DataFrame with vector embeddings
         """
-        df[self.vector_col] = df[col].map(
-            lambda x: self.model.encode(x.lower()).reshape(-1))
-        self.vector_dim = max(df[self.vector_col].iloc[0].shape)
+        codes, uniques = pd.factorize(df[col].astype(str).str.lower())
+        if len(codes):
+            logger.info(
+                f"Encoding {len(uniques)} distinct texts for {len(codes)} rows "
+                f"(dedup ratio {1 - len(uniques) / len(codes):.1%})")
+        matrix = prepare_vectors(
+            self.encode(uniques.to_list(), batch_size=batch_size),
+            self.vector_storage
+        )[codes]
+        df[self.vector_col] = list(matrix)
+        self.vector_dim = matrix.shape[1]
         return df
 
-    def get_all_id_data(self):
-        query = {
-            "_source": "id",
-            'query': {
-                'match_all': {}
-            }
-        }
-        response = self.db.search(
-            body=query,
-            index=self.index_name_db
-        )
-        return [h['_source']["id"] for h in response["hits"]["hits"]]
+    def source_filter(self, cols=None, with_vectors: bool = False):
+        """
+        Build the `_source` filter of a read request. Vectors make up most of
+        a document, so they are excluded unless columns are listed explicitly
+        or `with_vectors` is set.
+
+        :param cols: Columns of `_source` to retrieve, False for none
+        :param with_vectors: Return the vector column when no columns are listed
+        :return: Value of `_source`, None for the whole document
+        """
+        if cols is not None:
+            return cols
+        if with_vectors:
+            return None
+        return {"excludes": [self.vector_col]}
+
+    def iter_hits(self, cols=None, query: dict = None, size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream every hit of the index matching a query, page by page with
+        `search_after` on a point in time sorted by the (unique) primary key,
+        keeping memory bounded by one page whatever the size of the index.
+        The point in time is deleted once the walk ends.
+
+        :param cols: Columns of `_source` to retrieve, False for none,
+            None for all but the vectors
+        :param query: Query clause, defaults to `match_all`
+        :param size: Number of hits per page
+        :param with_vectors: Return the vectors when `cols` is not given
+        :return: Generator of raw OpenSearch hits
+        """
+        body = {"query": query or {"match_all": {}}}
+        source = self.source_filter(cols, with_vectors)
+        if source is not None:
+            body["_source"] = source
+        body["size"] = size = size or self.scroll_size
+        body["sort"] = [{self.index_col: "asc"}]
+        pit_id = self.db.create_pit(
+            index=self.index_name_db, keep_alive=self.pit_keep_alive)["pit_id"]
+        try:
+            while True:
+                body["pit"] = {"id": pit_id, "keep_alive": self.pit_keep_alive}
+                response = self.db.search(body=body)
+                hits = response["hits"]["hits"]
+                yield from hits
+                if len(hits) < size:
+                    break
+                pit_id = response.get("pit_id", pit_id)
+                body["search_after"] = hits[-1]["sort"]
+        finally:
+            self.db.delete_pit(body={"pit_id": [pit_id]})
+
+    def iter_ids(self):
+        """
+        Stream all document IDs of the index without their `_source`.
+
+        :return: Generator of document IDs
+        """
+        for hit in self.iter_hits(cols=False):
+            yield hit["_id"]
+
+    def get_all_id_data(self) -> set:
+        """
+        Retrieve all document IDs of the index.
+
+        :return: Set of document IDs
+        """
+        return set(self.iter_ids())
 
     def index_exists(self) -> bool:
         return self.db.indices.exists(index=self.index_name_db)
 
-    def get_data(self, cols: list = None, settings_index: dict = None):
+    def iter_data(self, cols=None, query: dict = None, chunk_size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream the documents of the index as DataFrame chunks.
+
+        :param cols: Columns to retrieve, defaults to all but the vectors
+        :param query: Query clause, defaults to `match_all`
+        :param chunk_size: Number of documents per chunk, defaults to `scroll_size`
+        :param with_vectors: Return the vectors when `cols` is not given
+        :return: Generator of DataFrames of up to `chunk_size` documents
+        """
+        chunk_size = chunk_size or self.scroll_size
+        rows = []
+        for hit in self.iter_hits(cols=cols, query=query, size=chunk_size,
+                                  with_vectors=with_vectors):
+            rows.append(hit["_source"])
+            if len(rows) == chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows)
+
+    def get_all_data(self, cols=None, query: dict = None, chunk_size: int = None,
+                     with_vectors: bool = False, max_bytes: int = None) -> pd.DataFrame:
+        """
+        Retrieve every document of the index matching a query in one DataFrame.
+
+        :param cols: Columns to retrieve, defaults to all but the vectors
+        :param query: Query clause, defaults to `match_all`
+        :param chunk_size: Number of documents per page
+        :param with_vectors: Return the vectors when `cols` is not given
+        :param max_bytes: Memory budget of the chunks, defaults to `max_data_bytes`
+        :return: DataFrame of the `_source` of the documents
+        :raises MemoryError: If the documents do not fit in the memory budget
+        """
+        max_bytes = max_bytes or self.max_data_bytes
+        chunks, total = [], 0
+        for chunk in self.iter_data(cols=cols, query=query, chunk_size=chunk_size,
+                                    with_vectors=with_vectors):
+            total += int(chunk.memory_usage(deep=True).sum())
+            if total > max_bytes:
+                logger.error(
+                    f"Stopped reading {self.index_name_db} after "
+                    f"{sum(len(c) for c in chunks)} documents: over {max_bytes} bytes")
+                raise MemoryError(
+                    f"Documents of {self.index_name_db} exceed the memory budget "
+                    f"of {max_bytes} bytes, use iter_data instead")
+            chunks.append(chunk)
+        logger.info(f"Get {sum(len(c) for c in chunks)} datas")
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def search(self, body: dict) -> list:
+        """
+        Run a search request against the index.
+
+        :param body: Search body
+        :return: Raw OpenSearch hits
+        """
+        return self.db.search(body=body, index=self.index_name_db)["hits"]["hits"]
+
+    def get_data(self, cols: list = None, settings_index: dict = None,
+                 with_vectors: bool = False):
+        """
+        Retrieve documents of the index as a DataFrame. Unless columns are
+        listed, the vector column is left out of the response. A custom search
+        body runs as a single request, otherwise the whole index is read page
+        by page with `get_all_data`.
+
+        :param cols: Columns to retrieve
+        :param settings_index: Custom search body
+        :param with_vectors: Return the vectors too
+        :return: DataFrame of the `_source` of the hits
+        """
         if isinstance(cols, list) and all([
                 c in ([self.vector_col, self.index_col] + self.other_cols)
                 for c in cols
             ]):
-            docs = self.db.search(
-                body={
-                    "size": 1000,
-                    "_source": cols,
-                    "query": {"match_all": {}}
-                },
-                index=self.index_name_db
-            )
-        elif isinstance(settings_index, dict):
-            docs = self.db.search(
-                body=settings_index,
-                index=self.index_name_db
-            )
-        else:
+            return self.get_all_data(cols=cols)
+        elif not isinstance(settings_index, dict):
             logger.warning("All cols are getting, here !")
-            docs = self.db.search(
-                body={
-                    "size": 1000,
-                    "query": {"match_all": {}}
-                },
-                index=self.index_name_db
-            )
-        data = docs["hits"]["hits"]
+            return self.get_all_data(with_vectors=with_vectors)
+        body = dict(settings_index)
+        source = self.source_filter(with_vectors=with_vectors)
+        if "_source" not in body and source is not None:
+            body["_source"] = source
+        data = self.search(body)
         logger.info(f"Get {len(data)} datas")
         return pd.DataFrame([d["_source"] for d in data])
 
@@ -138,15 +315,17 @@ class SenderVectorDB:
         if not self.db.indices.exists(index=self.index_name_db):
             try:
                 logger.info(f"Creating index {self.index_name_db}")
-                properties = {
-                    self.vector_col: {
+                if self.vector_storage == "float32":
+                    vector_field = {
                         'type': 'knn_vector',
                         'dimension': self.vector_dim
                     }
-                }
+                else:
+                    vector_field = knn_field(self.vector_storage, self.vector_dim)
+                properties = {self.vector_col: vector_field}
                 properties.update(
                     {
-                        c: {"type": "text"}
+                        c: {"type": self.field_types.get(c, "text")}
                         for c in self.other_cols
                     }
                 )
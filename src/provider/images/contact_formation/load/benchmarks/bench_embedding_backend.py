@@ -0,0 +1,80 @@
+"""
+Compare throughput and peak memory of the torch and quantized ONNX encoders.
+
+Each backend runs in its own subprocess so that the reported peak RSS only
+accounts for that backend.
+
+Usage (from the load directory):
+    python benchmarks/bench_embedding_backend.py --model-dir ./data/models/onnx
+"""
+from pathlib import Path
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+MODEL_NAME = "dangvantuan/sentence-camembert-base"
+
+
+def run_backend(backend: str, model_dir: str, quantization: str,
+                n_texts: int, batch_size: int) -> dict:
+    from utils.model_registry import LazyModel
+    from utils.onnx_backend import PARITY_SAMPLE, onnx_model
+
+    if backend == "onnx":
+        model = onnx_model(model_dir, quantization)
+    else:
+        model = LazyModel(MODEL_NAME)
+    texts = [
+        f"{PARITY_SAMPLE[i % len(PARITY_SAMPLE)]} {i}" for i in range(n_texts)
+    ]
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "texts_per_sec": n_texts / elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--quantization", default="avx2")
+    parser.add_argument("--n-texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--backend", choices=["torch", "onnx"])
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_backend(
+            args.backend, args.model_dir, args.quantization,
+            args.n_texts, args.batch_size)))
+        return
+
+    from utils.onnx_backend import export_quantized_onnx
+    export_quantized_onnx(MODEL_NAME, args.model_dir, args.quantization)
+    results = []
+    for backend in ["torch", "onnx"]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--backend", backend,
+             "--model-dir", args.model_dir, "--quantization", args.quantization,
+             "--n-texts", str(args.n_texts), "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for r in results:
+        print(f"{r['backend']:>6}: {r['texts_per_sec']:8.1f} texts/s, "
+              f"peak RSS {r['peak_rss_mb']:7.1f} MB")
+    print(f"speedup: {results[1]['texts_per_sec'] / results[0]['texts_per_sec']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Evaluate the recall@k of each vector storage against exact float32 results.
+
+A sample of the documents is used as queries; for each storage the documents
+and queries are prepared as they would be indexed, the top-k is computed by
+brute force and compared with the exact float32 cosine top-k (the query
+itself excluded). This isolates the loss due to normalization and
+quantization from the HNSW approximation.
+
+Usage (from the load directory):
+    python benchmarks/eval_vector_storage.py --parquet ./data/formation.parquet --col domaine
+    python benchmarks/eval_vector_storage.py --vectors ./vectors.npy
+"""
+from pathlib import Path
+import argparse
+import sys
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.vector_storage import BYTE_SCALE, VECTOR_STORAGES, prepare_vectors  # noqa: E402
+
+MODEL_NAME = "dangvantuan/sentence-camembert-base"
+BYTES_PER_DIM = {"float32": 4, "normalized": 4, "fp16": 2, "byte": 1}
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray, query_ids: np.ndarray, k: int) -> np.ndarray:
+    scores = queries.astype(np.float32) @ docs.astype(np.float32).T
+    scores[np.arange(len(query_ids)), query_ids] = -np.inf
+    candidates = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def exact_top_k(vectors: np.ndarray, query_ids: np.ndarray, k: int) -> np.ndarray:
+    unit = prepare_vectors(vectors, "normalized")
+    return top_k(unit[query_ids], unit, query_ids, k)
+
+
+def storage_top_k(vectors: np.ndarray, query_ids: np.ndarray, k: int,
+                  storage: str, byte_scale: float) -> np.ndarray:
+    if storage == "float32":
+        return exact_top_k(vectors, query_ids, k)
+    docs = prepare_vectors(vectors, storage, byte_scale=byte_scale)
+    queries = docs[query_ids]
+    if storage == "fp16":
+        docs = docs.astype(np.float16)
+    return top_k(queries, docs, query_ids, k)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([
+        len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)
+    ]))
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.vectors:
+        return np.load(args.vectors).astype(np.float32)
+    import pandas as pd
+    from utils.model_registry import LazyModel
+    texts = pd.read_parquet(args.parquet, columns=[args.col])[args.col]
+    texts = texts.astype(str).str.lower().drop_duplicates().to_list()
+    return np.asarray(
+        LazyModel(MODEL_NAME).encode(texts, batch_size=64, convert_to_numpy=True),
+        dtype=np.float32
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", help="float32 .npy matrix, one vector per row")
+    parser.add_argument("--parquet", help="parquet file whose column is encoded")
+    parser.add_argument("--col", default="domaine")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-queries", type=int, default=500)
+    parser.add_argument("--byte-scale", type=float, default=BYTE_SCALE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not (args.vectors or args.parquet):
+        parser.error("one of --vectors or --parquet is required")
+
+    vectors = load_vectors(args)
+    k = min(args.k, len(vectors) - 1)
+    rng = np.random.default_rng(args.seed)
+    query_ids = rng.choice(len(vectors), size=min(args.n_queries, len(vectors)), replace=False)
+    truth = exact_top_k(vectors, query_ids, k)
+
+    unit = prepare_vectors(vectors, "normalized")
+    clipped = np.mean(np.abs(unit) * args.byte_scale > 127)
+    print(f"{len(vectors)} vectors of dimension {vectors.shape[1]}, "
+          f"{len(query_ids)} queries, k={k}")
+    for storage in VECTOR_STORAGES:
+        found = storage_top_k(vectors, query_ids, k, storage, args.byte_scale)
+        size_mb = len(vectors) * vectors.shape[1] * BYTES_PER_DIM[storage] / 1024 ** 2
+        extra = f", {clipped:.3%} components clipped" if storage == "byte" else ""
+        print(f"{storage:>10}: recall@{k} {recall_at_k(found, truth):.4f}, "
+              f"vectors {size_mb:8.1f} MB{extra}")
+
+
+if __name__ == "__main__":
+    main()
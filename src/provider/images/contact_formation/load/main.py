@@ -1,7 +1,14 @@
-from utils.conf_env import data_path, date
+from utils.conf_env import data_path, date, embedding_cache_path, \
+    embedding_cache_max_entries, embedding_backend, onnx_model_dir, \
+    onnx_quantization, encode_workers, load_batch_size, load_mode, \
+    keep_index_versions, bulk_load, force_merge, hnsw_params, vector_storage, \
+    vector_in_source, vector_db_backend, vector_db_path, multi_process_min_texts
+from utils.embedding_cache import EmbeddingCache
+from utils.onnx_backend import export_quantized_onnx, onnx_model
 from sender import SenderVectorDB
+from numpy_sender import NumpyVectorDB
 import os
-import pandas as pd
+import pyarrow.parquet as pq
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,19 +27,64 @@ def main():
         data_path, "processed",
         date.strftime(schema),  'formations.parquet'
     )
-    df = pd.read_parquet(processed_data_path)
+    parquet_file = pq.ParquetFile(processed_data_path)
+    columns = [
+        c for c in parquet_file.schema_arrow.names
+        if not c.startswith("__index_level_")
+    ]
+    model = None
+    cache_model_name = SenderVectorDB.model_name
+    if embedding_backend == "onnx":
+        logger.info("Use quantized ONNX backend")
+        export_quantized_onnx(
+            SenderVectorDB.model_name, onnx_model_dir, onnx_quantization)
+        model = onnx_model(onnx_model_dir, onnx_quantization)
+        cache_model_name += f":onnx-qint8-{onnx_quantization}"
+
     logger.info("Init database vector")
-    sender = SenderVectorDB(
+    embedding_cache = EmbeddingCache(
+        path=embedding_cache_path,
+        model_name=cache_model_name,
+        max_entries=embedding_cache_max_entries
+    )
+    backend = {}
+    sender_class = SenderVectorDB
+    if vector_db_backend == "numpy":
+        logger.info(f"Use numpy vector store in {vector_db_path}")
+        sender_class = NumpyVectorDB
+        backend["path"] = vector_db_path
+    sender = sender_class(
+            **backend,
             index_col="id",
             env_name_index="INDEX_FORMATION",
-            other_cols=df.columns.to_list()
+            other_cols=columns,
+            model=model,
+            embedding_cache=embedding_cache,
+            hnsw_params=hnsw_params,
+            vector_storage=vector_storage,
+            vector_in_source=vector_in_source
     )
-    logger.info("Extract vector")
-    df = sender.add_vector(
-        df=df, col="domaine"
-    )
-
-    sender.send_data(df=df)
+    logger.info("Extract vector and send data")
+    if embedding_backend == "torch":
+        sender.start_pool(
+            n_workers=encode_workers, lazy=True, min_texts=multi_process_min_texts)
+    try:
+        batches = (
+            batch.to_pandas()
+            for batch in parquet_file.iter_batches(
+                batch_size=load_batch_size, columns=columns)
+        )
+        if load_mode == "reindex":
+            sender.reindex(
+                batches, col="domaine", keep_versions=keep_index_versions,
+                force_merge=force_merge)
+        else:
+            sender.send_batches(
+                batches, col="domaine", sync=(load_mode == "sync"),
+                bulk_load=bulk_load, force_merge=force_merge)
+    finally:
+        sender.stop_pool()
+        embedding_cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+import logging
+import os
+import shutil
+from sender import SenderVectorDB
+from utils.numpy_store import NumpyStore, get_store
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorDB(SenderVectorDB):
+    """
+    A SenderVectorDB keeping the index in a local NumPy store instead of an
+    OpenSearch cluster, for offline runs and CI.
+
+    Each index is a `NumpyStore` directory under `path`, shared by the
+    instances of the process (see `get_store`). Search is exact:
+    vectors are normalized and scored with batched matrix products, so the
+    HNSW and bulk-load settings of the base class are ignored. The storage
+    setting still applies, as `add_vector` prepares the vectors for it: with
+    "byte", the store holds the int8 quantization, renormalized as float32.
+
+    Attributes:
+        path (Path): Directory holding one store per index.
+        store (NumpyStore): Store of `index_name_db`.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        """
+        Initialize the backend, opening the store of the index.
+
+        Args:
+            path (str | Path, optional): Directory holding the stores.
+                Defaults to the VECTOR_DB_PATH environment variable.
+            **kwargs: Arguments of `SenderVectorDB`.
+        """
+        self.path = Path(path or os.environ.get("VECTOR_DB_PATH", "./data/vector_db"))
+        super().__init__(**kwargs)
+        self.store = get_store(self.path / self.index_name_db, vector_col=self.vector_col)
+
+    def connect(self):
+        return None
+
+    def index_exists(self) -> bool:
+        return self.store.exists()
+
+    def create_index(self):
+        """
+        Create the store of the index. If it already exists, it does nothing.
+        """
+        if not self.store.exists():
+            self.store.create(self.vector_dim)
+        else:
+            logger.info("Index already exists")
+
+    def iter_hits(self, cols=None, query: dict = None, size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream every hit of the store matching a query, see `SenderVectorDB.iter_hits`.
+        """
+        yield from self.store.hits(self.source_filter(cols, with_vectors), query)
+
+    def search(self, body: dict) -> list:
+        """
+        Run a search body against the store, see `NumpyStore.search_body`.
+        """
+        return self.store.search_body(body)
+
+    def search_knn(self, vectors, k: int, query: dict = None) -> list:
+        """
+        Exact filtered top-k search of one or several query vectors.
+
+        Args:
+            vectors (array-like): One query vector, or a matrix of them.
+            k (int): Number of documents per query vector.
+            query (dict, optional): Filter restricting the candidate documents.
+
+        Returns:
+            list: For each query vector, the hits sorted by decreasing cosine similarity.
+        """
+        return [
+            [self.store.hit(row, self.source_filter(), score) for row, score in results]
+            for results in self.store.search(vectors, k, query)
+        ]
+
+    def _bulk(self, actions, chunk_size: int = None, max_chunk_bytes: int = None) -> dict:
+        """
+        Write index actions to the store.
+
+        Returns:
+            dict: Counts of indexed and failed documents.
+        """
+        ids, sources, vectors = [], [], []
+        for action in actions:
+            source = dict(action["_source"])
+            vectors.append(source.pop(self.vector_col))
+            ids.append(action["_id"])
+            sources.append(source)
+        if ids:
+            self.store.upsert(ids, sources, vectors)
+        return {"indexed": len(ids), "failed": 0}
+
+    def _bulk_load_context(self, bulk_load: bool, force_merge: bool):
+        return nullcontext()
+
+    def update_data(self, id_doc: str, params: dict) -> None:
+        """
+        Merge the fields of a partial update into a document.
+
+        Args:
+            id_doc (str): ID of the document.
+            params (dict): Update body, with the new fields under "doc".
+        """
+        try:
+            self.store.update(id_doc, params["doc"])
+        except KeyError:
+            logger.error(f"Cannot update numpy vector store: unknown document {id_doc}")
+
+    def reindex(self, batches, col: str, batch_size: int = None, **kwargs) -> dict:
+        """
+        Rebuild the whole store without exposing a partial one to readers.
+
+        The batches are loaded into a new store next to the live one, whose
+        files are then replaced by the new ones (see `NumpyStore.replace_with`).
+        If the load fails, the new store is deleted and the live one is left
+        untouched. The OpenSearch options (`keep_versions`, `force_merge`) are
+        ignored.
+
+        Args:
+            batches (iterable): DataFrames with the metadata columns.
+            col (str): Column name containing text to encode into vectors.
+            batch_size (int, optional): Number of texts per forward pass.
+
+        Returns:
+            dict: Counts of indexed, updated, skipped and failed documents.
+        """
+        store = self.store
+        version = self.path / f"{self.index_name_db}-v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        logger.info(f"Reindex {self.index_name_db} into {version}")
+        self.store = NumpyStore(version, vector_col=self.vector_col)
+        try:
+            counts = self.send_batches(batches, col=col, batch_size=batch_size)
+            store.replace_with(version)
+        finally:
+            self.store = store
+            shutil.rmtree(version, ignore_errors=True)
+        return counts
@@ -1,10 +1,22 @@
-from opensearchpy import OpenSearch
+from opensearchpy import OpenSearch, helpers
+from typing import TYPE_CHECKING
 import logging
 import os
-from sentence_transformers import SentenceTransformer
+import numpy as np
 import pandas as pd
 import traceback
+import json
+from hashlib import md5
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from contextlib import contextmanager, nullcontext
+from utils.embedding_cache import EmbeddingCache
+from utils.model_registry import LazyModel
+from utils.vector_storage import check_storage, knn_field, prepare_vectors
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +27,44 @@ class SenderVectorDB:
     
     Attributes:
         vector_col (str): Name of the column to store vector embeddings.
+        hash_col (str): Name of the column storing the content hash of a document.
         index_col (str): Name of the primary key column.
         other_cols (list): List of other metadata columns to include.
-        model (SentenceTransformer): Pre-trained SentenceTransformer model for embeddings.
+        field_types (dict): OpenSearch type of the metadata columns that are not
+            prose: keyword for codes, IDs and status, date for timestamps.
+            Any other column is mapped as text.
+        model (LazyModel): Pre-trained SentenceTransformer model for embeddings,
+            shared by the process and loaded on first encode.
+        model_name (str): Name of the pre-trained model, used to address cached embeddings.
+        embedding_cache (EmbeddingCache): Optional on-disk cache consulted before encoding.
         vector_dim (int): Dimensionality of the vector embeddings.
+        warm_vector (np.ndarray): Last vector encoded by `add_vector`, used as
+            the query of `warm_index`.
+        vector_storage (str): Layout of the knn_vector field, one of "float32"
+            (cosinesimil on raw vectors), "normalized" (innerproduct on unit
+            vectors), "fp16" or "byte" (quantized unit vectors).
+        vector_in_source (bool): Whether vectors are kept in `_source`. When False
+            they only live in the k-NN structure and cannot be read back.
+        batch_size (int): Number of texts encoded per forward pass.
+        pool (dict): Multi-process encoding pool, started by `start_pool`.
+        pool_workers (int): Number of workers of a pool deferred by `start_pool`,
+            started by the first large enough `encode`.
+        multi_process_min_texts (int): Minimum number of texts to encode with the pool.
+        bulk_chunk_size (int): Maximum number of documents per `_bulk` request.
+        bulk_max_chunk_bytes (int): Maximum size in bytes of a `_bulk` request.
+        scroll_size (int): Number of hits per page when walking the whole index.
+        pit_keep_alive (str): How long the point in time of a walk is kept
+            between two pages.
+        max_data_bytes (int): Memory budget of the DataFrame built by `get_all_data`.
+        hnsw_m (int): Number of neighbours per node of the HNSW graph.
+        hnsw_ef_construction (int): Size of the candidate list when building the graph.
+        hnsw_ef_search (int): Size of the candidate list at query time (nmslib and
+            faiss engines; the lucene engine derives it from `k`).
         index_name_db (str): Name of the OpenSearch index to interact with.
     """
     
     vector_col = "vector_index"
+    hash_col = "content_hash"
     index_col = "id"
     other_cols = [
         "nom_formation", "domaine_formation",
@@ -30,13 +72,43 @@ class SenderVectorDB:
         "url_fiche_formation", "mail_responsables", "universite",
         "ville", "url"
     ]
-    model = SentenceTransformer("dangvantuan/sentence-camembert-base")
+    field_types = {
+        "id": "keyword",
+        "raw_id": "keyword",
+        "cp": "keyword",
+        "number_departement": "keyword",
+        "status": "keyword",
+        "url": "keyword",
+        "url_fiche_formation": "keyword",
+        "created_at": "date",
+        "updated_at": "date",
+    }
+    model_name = "dangvantuan/sentence-camembert-base"
+    model = LazyModel(model_name)
+    embedding_cache = None
     vector_dim = 768
+    warm_vector = None
+    vector_storage = "float32"
+    vector_in_source = True
+    batch_size = 64
+    pool = None
+    pool_workers = 0
+    multi_process_min_texts = 1000
+    bulk_chunk_size = 500
+    bulk_max_chunk_bytes = 10 * 1024 * 1024
+    scroll_size = 1000
+    pit_keep_alive = "1m"
+    max_data_bytes = 512 * 1024 * 1024
+    hnsw_m = 16
+    hnsw_ef_construction = 100
+    hnsw_ef_search = 100
     index_name_db = "index"
 
     def __init__(self, vector_col: str = None, index_col: str = None,
-                 other_cols: list = None, model: SentenceTransformer = None,
-                 env_name_index: str = None):
+                 other_cols: list = None, model: "SentenceTransformer" = None,
+                 env_name_index: str = None, embedding_cache: EmbeddingCache = None,
+                 hnsw_params: dict = None, vector_storage: str = None,
+                 vector_in_source: bool = None):
         """
         Initialize the SenderVectorDB instance with optional overrides for configuration.
 
@@ -46,6 +118,11 @@ class SenderVectorDB:
             other_cols (list, optional): List of additional metadata columns.
             model (SentenceTransformer, optional): Custom SentenceTransformer model for embeddings.
             env_name_index (str, optional): Environment variable name for the index name.
+            embedding_cache (EmbeddingCache, optional): On-disk cache of embeddings.
+            hnsw_params (dict, optional): Overrides of the HNSW settings, with keys
+                "m", "ef_construction" and "ef_search".
+            vector_storage (str, optional): Layout of the knn_vector field.
+            vector_in_source (bool, optional): Whether vectors are kept in `_source`.
 
         Raises:
             RuntimeError: If database initialization fails.
@@ -62,14 +139,41 @@ class SenderVectorDB:
         if model is not None:
             self.model = model
 
+        if embedding_cache is not None:
+            self.embedding_cache = embedding_cache
+
+        if hnsw_params is not None:
+            for key, value in hnsw_params.items():
+                if value is not None:
+                    setattr(self, f"hnsw_{key}", value)
+
+        if vector_storage is not None:
+            self.vector_storage = check_storage(vector_storage)
+
+        if vector_in_source is not None:
+            self.vector_in_source = vector_in_source
+
         if env_name_index in os.environ:
             self.index_name_db = os.environ[env_name_index]
 
+        self.db = self.connect()
+
+    def connect(self) -> OpenSearch:
+        """
+        Build the OpenSearch client from the OPTION_DB_VECTOR and HOST_DB_VECTOR
+        environment variables.
+
+        Returns:
+            OpenSearch: The client.
+
+        Raises:
+            RuntimeError: If database initialization fails.
+        """
         try:
             option_db = eval(os.environ["OPTION_DB_VECTOR"])
             option_host = eval(os.environ["HOST_DB_VECTOR"])
             if isinstance(option_db, dict) and isinstance(option_host, list):
-                self.db = OpenSearch(
+                return OpenSearch(
                     hosts=option_host,
                     **option_db
                 )
@@ -82,13 +186,131 @@ class SenderVectorDB:
             logger.critical(f"Failed to initialize database managers: {e}")
             raise
 
-    def add_vector(self, df, col) -> pd.DataFrame:
+    def start_pool(self, n_workers: int, lazy: bool = False, min_texts: int = None) -> None:
+        """
+        Start a pool of encoding processes, reused by every encode until `stop_pool`.
+
+        Each worker runs a single-threaded copy of the model, so `n_workers`
+        should match the CPUs allotted to the pod. A lazy pool is only started
+        by the first `encode` of at least `multi_process_min_texts` texts, so
+        runs with little or nothing to encode never load the workers.
+
+        Args:
+            n_workers (int): Number of worker processes. Nothing is started below 2.
+            lazy (bool, optional): Whether to defer the start to the first large encode.
+            min_texts (int, optional): Overrides `multi_process_min_texts`.
+        """
+        if min_texts is not None:
+            self.multi_process_min_texts = min_texts
+        if self.pool is not None or n_workers < 2:
+            return
+        if lazy:
+            self.pool_workers = n_workers
+            return
+        model = self.model.load() if isinstance(self.model, LazyModel) else self.model
+        omp_num_threads = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = "1"
+        try:
+            self.pool = model.start_multi_process_pool(
+                target_devices=["cpu"] * n_workers)
+        finally:
+            if omp_num_threads is None:
+                del os.environ["OMP_NUM_THREADS"]
+            else:
+                os.environ["OMP_NUM_THREADS"] = omp_num_threads
+        logger.info(f"Started encoding pool with {n_workers} workers")
+
+    def stop_pool(self) -> None:
+        """
+        Stop the pool of encoding processes, if any.
+        """
+        self.pool_workers = 0
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+            logger.info("Stopped encoding pool")
+
+    def encode(self, texts: list, batch_size: int = None) -> np.ndarray:
+        """
+        Encode a list of texts in batches into a single embedding matrix.
+
+        When there are enough texts for the multi-process pool, it is started
+        if it was deferred by `start_pool`, and the texts are sharded across the
+        workers and reassembled in input order.
+
+        Args:
+            texts (list): Texts to encode.
+            batch_size (int, optional): Number of texts per forward pass.
+                Defaults to `self.batch_size`.
+
+        Returns:
+            np.ndarray: Contiguous float32 matrix of shape (len(texts), vector_dim).
+        """
+        if len(texts) == 0:
+            return np.empty((0, self.vector_dim), dtype=np.float32)
+        if self.pool is None and self.pool_workers \
+                and len(texts) >= self.multi_process_min_texts:
+            self.start_pool(self.pool_workers)
+        if self.pool is not None and len(texts) >= self.multi_process_min_texts:
+            n_workers = len(self.pool["processes"])
+            vectors = self.model.encode_multi_process(
+                texts,
+                self.pool,
+                batch_size=batch_size or self.batch_size,
+                chunk_size=-(-len(texts) // (4 * n_workers))
+            )
+        else:
+            vectors = self.model.encode(
+                texts,
+                batch_size=batch_size or self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    def encode_with_cache(self, texts: list, batch_size: int = None) -> np.ndarray:
+        """
+        Encode texts, reusing the vectors already stored in the embedding cache.
+
+        Args:
+            texts (list): Texts to encode.
+            batch_size (int, optional): Number of texts per forward pass.
+
+        Returns:
+            np.ndarray: Contiguous float32 matrix of shape (len(texts), vector_dim).
+        """
+        if self.embedding_cache is None or len(texts) == 0:
+            return self.encode(texts, batch_size=batch_size)
+
+        cached = self.embedding_cache.get_many(texts)
+        missing = [i for i, v in enumerate(cached) if v is None]
+        new_vectors = self.encode([texts[i] for i in missing], batch_size=batch_size)
+        if len(missing):
+            self.embedding_cache.put_many([texts[i] for i in missing], new_vectors)
+        self.embedding_cache.log_stats()
+
+        dim = new_vectors.shape[1] if len(missing) else cached[0].shape[0]
+        matrix = np.empty((len(texts), dim), dtype=np.float32)
+        for i, v in enumerate(cached):
+            if v is not None:
+                matrix[i] = v
+        matrix[missing] = new_vectors
+        return matrix
+
+    def add_vector(self, df, col, batch_size: int = None) -> pd.DataFrame:
         """
         Generate sentence embeddings for a specified column and add them to the DataFrame.
 
+        The column is lowercased and deduplicated, the distinct texts are
+        encoded in batches and their vectors are scattered back to the rows as
+        views on a float32 matrix. When an embedding cache is configured, only
+        the texts missing from it are encoded. Vectors are normalized (and
+        quantized) as required by `vector_storage`.
+
         Args:
             df (pd.DataFrame): Input pandas DataFrame.
             col (str): Column name containing text to encode into vectors.
+            batch_size (int, optional): Number of texts per forward pass.
 
         Returns:
             pd.DataFrame: Updated DataFrame with vector embeddings.
@@ -98,48 +320,271 @@ class SenderVectorDB:
         """
         logger.debug("--- add_vector ---")
         try:
-            df[self.vector_col] = df[col].map(
-                lambda x: self.model.encode(x.lower()).reshape(-1))
-            self.vector_dim = max(df[self.vector_col].iloc[0].shape)
+            codes, uniques = pd.factorize(df[col].astype(str).str.lower())
+            if len(codes):
+                logger.info(
+                    f"Encoding {len(uniques)} distinct texts for {len(codes)} rows "
+                    f"(dedup ratio {1 - len(uniques) / len(codes):.1%})")
+            matrix = self.encode_with_cache(uniques.to_list(), batch_size=batch_size)
+            matrix = prepare_vectors(matrix, self.vector_storage)[codes]
+            df[self.vector_col] = list(matrix)
+            self.vector_dim = matrix.shape[1]
+            if len(matrix):
+                self.warm_vector = matrix[-1]
             return df
         except Exception:
             logger.error(traceback.format_exc())
-            raise 
+            raise
+
+    def source_filter(self, cols=None, with_vectors: bool = False):
+        """
+        Build the `_source` filter of a read request.
+
+        Vectors make up most of a document, so they are excluded unless
+        columns are listed explicitly or `with_vectors` is set.
+
+        Args:
+            cols (list | bool, optional): Columns of `_source` to retrieve,
+                False to retrieve none of them.
+            with_vectors (bool, optional): Whether to return the vector column
+                when no columns are listed.
+
+        Returns:
+            list | bool | dict | None: Value of `_source`, None for the whole document.
+        """
+        if cols is not None:
+            return cols
+        if with_vectors:
+            return None
+        return {"excludes": [self.vector_col]}
+
+    def iter_hits(self, cols=None, query: dict = None, size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream every hit of the OpenSearch index matching a query.
+
+        The index is walked page by page with `search_after` on a point in
+        time, so memory stays bounded by one page whatever the size of the
+        index and the walk sees a consistent snapshot. Pages are sorted on the
+        primary key, which is unique, so no hit is skipped or repeated between
+        two pages. The point in time is deleted once the walk ends.
+
+        Args:
+            cols (list | bool, optional): Columns of `_source` to retrieve,
+                False to retrieve none of them. Defaults to the whole `_source`
+                without the vectors.
+            query (dict, optional): Query clause. Defaults to `match_all`.
+            size (int, optional): Number of hits per page.
+            with_vectors (bool, optional): Whether to return the vectors when
+                `cols` is not given.
+
+        Yields:
+            dict: Raw OpenSearch hits.
+        """
+        body = {"query": query or {"match_all": {}}}
+        source = self.source_filter(cols, with_vectors)
+        if source is not None:
+            body["_source"] = source
+        body["size"] = size = size or self.scroll_size
+        body["sort"] = [{self.index_col: "asc"}]
+        pit_id = self.db.create_pit(
+            index=self.index_name_db, keep_alive=self.pit_keep_alive)["pit_id"]
+        try:
+            while True:
+                body["pit"] = {"id": pit_id, "keep_alive": self.pit_keep_alive}
+                response = self.db.search(body=body)
+                hits = response["hits"]["hits"]
+                yield from hits
+                if len(hits) < size:
+                    break
+                pit_id = response.get("pit_id", pit_id)
+                body["search_after"] = hits[-1]["sort"]
+        finally:
+            self.db.delete_pit(body={"pit_id": [pit_id]})
+
+    def iter_ids(self):
+        """
+        Stream all document IDs of the OpenSearch index without their `_source`.
 
-    def get_all_id_data(self) -> list:
+        Yields:
+            str: Document IDs.
+        """
+        for hit in self.iter_hits(cols=False):
+            yield hit["_id"]
+
+    def get_all_id_data(self) -> set:
         """
         Retrieve all document IDs from the OpenSearch index.
 
         Returns:
-            list: List of document IDs.
+            set: Set of document IDs.
 
         Raises:
             Exception: If data retrieval fails.
         """
-        query = {
-            "_source": "id",
-            'query': {
-                'match_all': {}
-            }
-        }
-        response = self.db.search(
-            body=query,
-            index=self.index_name_db
-        )
         try:
-            return [h["_id"] for h in response["hits"]["hits"]]
+            ids = set(self.iter_ids())
+            logger.info(f"Get {len(ids)} ids from {self.index_name_db}")
+            return ids
         except Exception:
-            logger.error(response)
-            logger.error("query: "+str(query))
+            logger.error(traceback.format_exc())
             logger.error("index_name_db: "+self.index_name_db)
+            raise
 
-    def get_data(self, cols: list = None, settings_index: dict = None):
+    def get_all_hashes(self) -> dict:
+        """
+        Retrieve the content hash of every document of the OpenSearch index.
+
+        Returns:
+            dict: Content hash by document ID, None for documents without hash.
+        """
+        hashes = {
+            hit["_id"]: hit.get("_source", {}).get(self.hash_col)
+            for hit in self.iter_hits(cols=[self.hash_col])
+        }
+        logger.info(f"Get {len(hashes)} hashes from {self.index_name_db}")
+        return hashes
+
+    def content_hash(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Compute a hash of the metadata of each row, used to detect edited documents.
+
+        Args:
+            df (pd.DataFrame): DataFrame with the metadata columns.
+
+        Returns:
+            pd.Series: MD5 hex digest per row.
+        """
+        cols = [c for c in self.other_cols if c not in (self.vector_col, self.hash_col)]
+        return pd.Series(
+            [
+                md5(json.dumps(
+                    record, sort_keys=True, ensure_ascii=False,
+                    default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o)
+                ).encode()).hexdigest()
+                for record in df[cols].to_dict(orient="records")
+            ],
+            index=df.index,
+            dtype=object
+        )
+
+    def _select_rows(self, df: pd.DataFrame, in_db, sync: bool):
+        """
+        Select the rows to (re)index and stamp them with their content hash.
+
+        Args:
+            df (pd.DataFrame): DataFrame with the metadata columns.
+            in_db (set | dict): IDs in the index, or their content hash when `sync`.
+            sync (bool): Whether rows whose hash changed are indexed again.
+
+        Returns:
+            tuple: The rows to index and the counts of updated and skipped rows.
+        """
+        df = df.assign(**{self.hash_col: self.content_hash(df)})
+        is_known = df[self.index_col].isin(in_db)
+        if sync:
+            stored = df[self.index_col].map(in_db)
+            is_updated = is_known & (stored != df[self.hash_col])
+        else:
+            is_updated = pd.Series(False, index=df.index)
+        to_index = ~is_known | is_updated
+        counts = {
+            "updated": int(is_updated.sum()),
+            "skipped": int((~to_index).sum())
+        }
+        return df[to_index].copy(), counts
+
+    def iter_data(self, cols=None, query: dict = None, chunk_size: int = None,
+                  with_vectors: bool = False):
+        """
+        Stream the documents of the index as DataFrame chunks.
+
+        Args:
+            cols (list, optional): Columns to retrieve. Defaults to all but the vectors.
+            query (dict, optional): Query clause. Defaults to `match_all`.
+            chunk_size (int, optional): Number of documents per chunk.
+                Defaults to `self.scroll_size`.
+            with_vectors (bool, optional): Whether to return the vectors when
+                `cols` is not given.
+
+        Yields:
+            pd.DataFrame: `_source` of up to `chunk_size` documents.
+        """
+        chunk_size = chunk_size or self.scroll_size
+        rows = []
+        for hit in self.iter_hits(cols=cols, query=query, size=chunk_size,
+                                  with_vectors=with_vectors):
+            rows.append(hit["_source"])
+            if len(rows) == chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows)
+
+    def get_all_data(self, cols=None, query: dict = None, chunk_size: int = None,
+                     with_vectors: bool = False, max_bytes: int = None) -> pd.DataFrame:
+        """
+        Retrieve every document of the index matching a query in one DataFrame.
+
+        Args:
+            cols (list, optional): Columns to retrieve. Defaults to all but the vectors.
+            query (dict, optional): Query clause. Defaults to `match_all`.
+            chunk_size (int, optional): Number of documents per page.
+            with_vectors (bool, optional): Whether to return the vectors when
+                `cols` is not given.
+            max_bytes (int, optional): Memory budget of the chunks.
+                Defaults to `self.max_data_bytes`.
+
+        Returns:
+            pd.DataFrame: Data retrieved from the index.
+
+        Raises:
+            MemoryError: If the documents do not fit in the memory budget.
+        """
+        max_bytes = max_bytes or self.max_data_bytes
+        chunks, total = [], 0
+        for chunk in self.iter_data(cols=cols, query=query, chunk_size=chunk_size,
+                                    with_vectors=with_vectors):
+            total += int(chunk.memory_usage(deep=True).sum())
+            if total > max_bytes:
+                logger.error(
+                    f"Stopped reading {self.index_name_db} after "
+                    f"{sum(len(c) for c in chunks)} documents: over {max_bytes} bytes")
+                raise MemoryError(
+                    f"Documents of {self.index_name_db} exceed the memory budget "
+                    f"of {max_bytes} bytes, use iter_data instead")
+            chunks.append(chunk)
+        logger.info(f"Get {sum(len(c) for c in chunks)} datas")
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def search(self, body: dict) -> list:
+        """
+        Run a search request against the index.
+
+        Args:
+            body (dict): Search body.
+
+        Returns:
+            list: Raw OpenSearch hits.
+        """
+        return self.db.search(body=body, index=self.index_name_db)["hits"]["hits"]
+
+    def get_data(self, cols: list = None, settings_index: dict = None,
+                 with_vectors: bool = False):
         """
         Retrieve data from the OpenSearch index based on the specified columns or query.
 
+        Unless columns are listed, the vector column is left out of the
+        response: pass `with_vectors=True` to get it. A custom query runs as a
+        single search request, otherwise the whole index is read page by page
+        with `get_all_data`.
+
         Args:
             cols (list, optional): List of columns to retrieve.
             settings_index (dict, optional): Custom query to use.
+            with_vectors (bool, optional): Whether to return the vectors.
 
         Returns:
             pd.DataFrame: Data retrieved from the index.
@@ -149,29 +594,15 @@ class SenderVectorDB:
                 c in ([self.vector_col, self.index_col] + self.other_cols)
                 for c in cols
             ]):
-            docs = self.db.search(
-                body={
-                    "size": 1000,
-                    "_source": cols,
-                    "query": {"match_all": {}}
-                },
-                index=self.index_name_db
-            )
-        elif isinstance(settings_index, dict):
-            docs = self.db.search(
-                body=settings_index,
-                index=self.index_name_db
-            )
-        else:
+            return self.get_all_data(cols=cols)
+        elif not isinstance(settings_index, dict):
             logger.warning("All cols are getting, here !")
-            docs = self.db.search(
-                body={
-                    "size": 1000,
-                    "query": {"match_all": {}}
-                },
-                index=self.index_name_db
-            )
-        data = docs["hits"]["hits"]
+            return self.get_all_data(with_vectors=with_vectors)
+        body = dict(settings_index)
+        source = self.source_filter(with_vectors=with_vectors)
+        if "_source" not in body and source is not None:
+            body["_source"] = source
+        data = self.search(body)
         logger.info(f"Get {len(data)} datas")
         return pd.DataFrame([d["_source"] for d in data])
 
@@ -187,36 +618,31 @@ class SenderVectorDB:
             try:
                 logger.info(f"Creating index {self.index_name_db}")
                 properties = {
-                    self.vector_col: {
-                        'type': 'knn_vector',
-                        'dimension': self.vector_dim,
-                        "space_type": "cosinesimil",
-                        "method": {
-                            "name": "hnsw",
-                            "engine": "lucene",
-                            "parameters": {
-                                "ef_construction": 100,
-                                "m": 16
-                            }
-                        }
-                    }
+                    self.vector_col: knn_field(
+                        self.vector_storage, self.vector_dim,
+                        m=self.hnsw_m, ef_construction=self.hnsw_ef_construction
+                    )
                 }
                 properties.update(
                     {
-                        c: {"type": "text"}
+                        c: {"type": self.field_types.get(c, "text")}
                         for c in self.other_cols
                     }
                 )
+                properties[self.hash_col] = {"type": "keyword"}
                 body = {
                         "settings": {
                             "index": {
-                                "knn": True
+                                "knn": True,
+                                "knn.algo_param.ef_search": self.hnsw_ef_search
                             }
                         },
                         "mappings": {
                             "properties": properties
                         }
                 } 
+                if not self.vector_in_source:
+                    body["mappings"]["_source"] = {"excludes": [self.vector_col]}
                 self.db.indices.create(
                     index=self.index_name_db,
                     body=body
@@ -229,27 +655,302 @@ class SenderVectorDB:
         else:
             logger.info("Index already exists")
 
-    def send_data(self, df: pd.DataFrame):
+    @contextmanager
+    def bulk_load_settings(self, force_merge: bool = False, max_num_segments: int = 1):
+        """
+        Disable refresh and replicas of the index while bulk loading it.
+
+        The previous `refresh_interval` and `number_of_replicas` are restored on
+        exit, even if the load failed, then the index is refreshed and optionally
+        force-merged.
+
+        Args:
+            force_merge (bool, optional): Whether segments are merged after the load.
+            max_num_segments (int, optional): Number of segments to merge into.
+        """
+        keys = ["index.refresh_interval", "index.number_of_replicas"]
+        response = self.db.indices.get_settings(
+            index=self.index_name_db, name=",".join(keys),
+            flat_settings=True, include_defaults=True
+        )
+        settings = next(iter(response.values()))
+        previous = {
+            key: settings.get("settings", {}).get(key, settings.get("defaults", {}).get(key))
+            for key in keys
+        }
+        logger.info(f"Bulk load mode on {self.index_name_db}, previous settings: {previous}")
+        self.db.indices.put_settings(
+            index=self.index_name_db,
+            body={"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+        )
+        try:
+            yield
+        finally:
+            self.db.indices.put_settings(index=self.index_name_db, body=previous)
+            self.db.indices.refresh(index=self.index_name_db)
+            if force_merge:
+                logger.info(f"Force merge {self.index_name_db}")
+                self.db.indices.forcemerge(
+                    index=self.index_name_db,
+                    max_num_segments=max_num_segments,
+                    request_timeout=3600
+                )
+            logger.info(f"Bulk load mode off on {self.index_name_db}")
+
+    def _bulk_load_context(self, bulk_load: bool, force_merge: bool):
+        if bulk_load:
+            return self.bulk_load_settings(force_merge=force_merge)
+        return nullcontext()
+
+    def _documents(self, df: pd.DataFrame):
+        """
+        Build the `_bulk` index actions of a DataFrame, one row at a time.
+
+        Args:
+            df (pd.DataFrame): DataFrame with vector and metadata columns.
+
+        Yields:
+            dict: Index actions targeting `index_name_db`.
+        """
+        all_cols = deepcopy(self.other_cols)
+        all_cols.append(self.vector_col)
+        if self.hash_col in df.columns and self.hash_col not in all_cols:
+            all_cols.append(self.hash_col)
+        for id_doc, doc in zip(df[self.index_col], df[all_cols].to_dict(orient="records")):
+            yield {"_index": self.index_name_db, "_id": id_doc, "_source": doc}
+
+    def _bulk(self, actions, chunk_size: int = None, max_chunk_bytes: int = None) -> dict:
+        """
+        Send index actions through the `_bulk` API and report failures per item.
+
+        Args:
+            actions (iterable): Index actions.
+            chunk_size (int, optional): Maximum number of documents per request.
+            max_chunk_bytes (int, optional): Maximum size in bytes of a request.
+
+        Returns:
+            dict: Counts of indexed and failed documents.
+        """
+        counts = {"indexed": 0, "failed": 0}
+        for ok, item in helpers.streaming_bulk(
+            self.db, actions,
+            chunk_size=chunk_size or self.bulk_chunk_size,
+            max_chunk_bytes=max_chunk_bytes or self.bulk_max_chunk_bytes,
+            max_retries=3,
+            raise_on_error=False,
+            raise_on_exception=False
+        ):
+            if ok:
+                counts["indexed"] += 1
+            else:
+                counts["failed"] += 1
+                _, info = item.popitem()
+                error = info.get("error")
+                if isinstance(error, dict):
+                    error = f"{error.get('type')}: {error.get('reason')}"
+                logger.error(
+                    f"Failed to index doc {info.get('_id')} "
+                    f"(status {info.get('status')}): {error}")
+        return counts
+
+    def _log_counts(self, counts: dict) -> None:
+        logger.info(
+            f"Sent data to {self.index_name_db}: {counts['indexed']} indexed "
+            f"(of which {counts['updated']} updated), {counts['skipped']} skipped, "
+            f"{counts['failed']} failed")
+
+    def send_data(self, df: pd.DataFrame, chunk_size: int = None,
+                  max_chunk_bytes: int = None, sync: bool = False,
+                  bulk_load: bool = False, force_merge: bool = False) -> dict:
         """
         Send data to the OpenSearch index after creating it, if necessary.
 
+        Documents whose ID is already in the index are skipped, the others are
+        sent through the `_bulk` API in chunks bounded by a number of documents
+        and a size in bytes. In sync mode, known documents whose content hash
+        changed are sent again and overwrite the stored ones.
+
         Args:
             df (pd.DataFrame): Input pandas DataFrame with vector and metadata columns.
+            chunk_size (int, optional): Maximum number of documents per request.
+            max_chunk_bytes (int, optional): Maximum size in bytes of a request.
+            sync (bool, optional): Whether edited documents are updated.
+            bulk_load (bool, optional): Whether refresh and replicas are disabled
+                during the load, see `bulk_load_settings`.
+            force_merge (bool, optional): Whether segments are merged after a bulk load.
+
+        Returns:
+            dict: Counts of indexed, updated, skipped and failed documents.
         """
         logger.debug("--- send_data ---")
         self.create_index()
-        ids_in_db = self.get_all_id_data()
-        all_cols = deepcopy(self.other_cols)
-        all_cols.append(self.vector_col)
-        documents = df[all_cols].to_dict(orient="records")
-        ids = df[self.index_col].to_list()
-        for id_doc, doc in zip(ids, documents):
-            if id_doc not in ids_in_db:
-                try:
-                    self.db.index(
-                        index=self.index_name_db,
-                        id=id_doc,
-                        body=doc
-                    )
-                except Exception:
-                    logger.error(f"This doc not working:{id_doc} with values: {doc}")
+        in_db = self.get_all_hashes() if sync else self.get_all_id_data()
+        df, selected = self._select_rows(df, in_db, sync)
+        with self._bulk_load_context(bulk_load, force_merge):
+            counts = self._bulk(
+                self._documents(df),
+                chunk_size=chunk_size,
+                max_chunk_bytes=max_chunk_bytes
+            )
+        counts.update(selected)
+        self._log_counts(counts)
+        return counts
+
+    def send_batches(self, batches, col: str, batch_size: int = None,
+                     sync: bool = False, bulk_load: bool = False,
+                     force_merge: bool = False) -> dict:
+        """
+        Embed and send a stream of DataFrames, one batch at a time.
+
+        Rows already in the index are dropped before encoding, unless their
+        content hash changed in sync mode. While batch N is sent by a background
+        thread, batch N+1 is encoded, and at most these two batches are held in
+        memory.
+
+        Args:
+            batches (iterable): DataFrames with the metadata columns.
+            col (str): Column name containing text to encode into vectors.
+            batch_size (int, optional): Number of texts per forward pass.
+            sync (bool, optional): Whether edited documents are re-embedded and updated.
+            bulk_load (bool, optional): Whether refresh and replicas are disabled
+                during the load, see `bulk_load_settings`.
+            force_merge (bool, optional): Whether segments are merged after a bulk load.
+
+        Returns:
+            dict: Counts of indexed, updated, skipped and failed documents.
+        """
+        logger.debug("--- send_batches ---")
+        self.create_index()
+        in_db = self.get_all_hashes() if sync else self.get_all_id_data()
+        counts = {"indexed": 0, "updated": 0, "skipped": 0, "failed": 0}
+
+        def collect(future):
+            for key, value in future.result().items():
+                counts[key] += value
+
+        with self._bulk_load_context(bulk_load, force_merge), \
+                ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            for df in batches:
+                df, selected = self._select_rows(df, in_db, sync)
+                for key, value in selected.items():
+                    counts[key] += value
+                if df.empty:
+                    continue
+                df = self.add_vector(df=df, col=col, batch_size=batch_size)
+                if pending is not None:
+                    collect(pending)
+                pending = executor.submit(self._bulk, self._documents(df))
+            if pending is not None:
+                collect(pending)
+
+        self._log_counts(counts)
+        return counts
+
+    def warm_index(self) -> None:
+        """
+        Refresh the index and run a k-NN query so its segments and HNSW graphs
+        are loaded before readers are pointed at it.
+
+        The query vector is the last one encoded by `add_vector`, as vectors
+        may not be kept in `_source`. Without it, only the refresh is done.
+        """
+        self.db.indices.refresh(index=self.index_name_db)
+        if self.warm_vector is not None:
+            self.db.search(
+                index=self.index_name_db,
+                body={
+                    "size": 10,
+                    "_source": False,
+                    "query": {"knn": {self.vector_col: {
+                        "vector": self.warm_vector.tolist(), "k": 10
+                    }}}
+                }
+            )
+        logger.info(f"Index {self.index_name_db} warmed")
+
+    def swap_alias(self, alias: str, index: str) -> None:
+        """
+        Atomically point an alias to an index.
+
+        The alias is removed from the indices it pointed to. A legacy concrete
+        index named like the alias is deleted in the same request.
+
+        Args:
+            alias (str): Name read by the application.
+            index (str): Fully built index the alias should target.
+        """
+        actions = []
+        if self.db.indices.exists_alias(name=alias):
+            actions += [
+                {"remove": {"index": old, "alias": alias}}
+                for old in self.db.indices.get_alias(name=alias)
+            ]
+        elif self.db.indices.exists(index=alias):
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": index, "alias": alias}})
+        self.db.indices.update_aliases(body={"actions": actions})
+        logger.info(f"Alias {alias} now targets {index}")
+
+    def prune_versions(self, alias: str, keep_versions: int) -> list:
+        """
+        Delete the oldest versioned indices of an alias.
+
+        Args:
+            alias (str): Name of the alias.
+            keep_versions (int): Number of most recent versions to keep.
+
+        Returns:
+            list: Names of the deleted indices.
+        """
+        versions = sorted(self.db.indices.get(index=f"{alias}-v*").keys())
+        in_use = set(self.db.indices.get_alias(name=alias)) \
+            if self.db.indices.exists_alias(name=alias) else set()
+        to_delete = [
+            v for v in versions[:max(0, len(versions) - keep_versions)]
+            if v not in in_use
+        ]
+        for index in to_delete:
+            self.db.indices.delete(index=index)
+            logger.info(f"Deleted old index {index}")
+        return to_delete
+
+    def reindex(self, batches, col: str, batch_size: int = None,
+                keep_versions: int = 2, force_merge: bool = True) -> dict:
+        """
+        Rebuild the whole index without downtime for readers.
+
+        `index_name_db` is used as an alias: the batches are loaded into a new
+        versioned index in bulk load mode, which is warmed then swapped in
+        atomically. Older versions beyond `keep_versions` are deleted. If the
+        load fails, the new index is deleted and the alias is left untouched.
+
+        Args:
+            batches (iterable): DataFrames with the metadata columns.
+            col (str): Column name containing text to encode into vectors.
+            batch_size (int, optional): Number of texts per forward pass.
+            keep_versions (int, optional): Number of versions to keep, including the new one.
+            force_merge (bool, optional): Whether segments are merged before the swap.
+
+        Returns:
+            dict: Counts of indexed, updated, skipped and failed documents.
+        """
+        alias = self.index_name_db
+        version = f"{alias}-v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        logger.info(f"Reindex {alias} into {version}")
+        self.index_name_db = version
+        try:
+            counts = self.send_batches(
+                batches, col=col, batch_size=batch_size,
+                bulk_load=True, force_merge=force_merge
+            )
+            self.warm_index()
+        except Exception:
+            logger.error(traceback.format_exc())
+            self.db.indices.delete(index=version, ignore_unavailable=True)
+            raise
+        finally:
+            self.index_name_db = alias
+        self.swap_alias(alias, version)
+        self.prune_versions(alias, keep_versions)
+        return counts
@@ -0,0 +1,26 @@
+import conftest
+from unittest.mock import patch
+from utils.cpu_quota import available_cpus
+
+
+@patch("os.sched_getaffinity", return_value=set(range(16)))
+def test_available_cpus_cgroup_v2(mock_affinity, tmp_path):
+    """Test that the cgroup v2 quota limits the number of CPUs."""
+    (tmp_path / "cpu.max").write_text("300000 100000\n")
+    assert available_cpus(tmp_path) == 3
+
+
+@patch("os.sched_getaffinity", return_value=set(range(16)))
+def test_available_cpus_cgroup_v1(mock_affinity, tmp_path):
+    """Test that the cgroup v1 quota limits the number of CPUs."""
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("150000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert available_cpus(tmp_path) == 1
+
+
+@patch("os.sched_getaffinity", return_value=set(range(4)))
+def test_available_cpus_unlimited(mock_affinity, tmp_path):
+    """Test that visible CPUs are used without quota."""
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert available_cpus(tmp_path) == 4
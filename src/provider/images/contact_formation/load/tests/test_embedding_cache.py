@@ -0,0 +1,37 @@
+import pytest
+import conftest
+import numpy as np
+from utils.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture to open an embedding cache in a temporary directory."""
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", model_name="test-model", max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_get_many_miss_then_hit(cache):
+    """Test that stored vectors are returned for normalized texts."""
+    assert cache.get_many(["Hello world"]) == [None]
+    cache.put_many(["Hello world"], np.ones((1, 3), dtype=np.float32))
+    vectors = cache.get_many(["  hello   WORLD "])
+    assert np.array_equal(vectors[0], np.ones(3, dtype=np.float32))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_model(cache, tmp_path):
+    """Test that the same text is addressed differently for another model."""
+    other = EmbeddingCache(tmp_path / "embeddings.sqlite", model_name="other-model")
+    assert cache.key("text") != other.key("text")
+    other.close()
+
+
+def test_evict_least_recently_used(cache):
+    """Test that the cache keeps at most max_entries vectors."""
+    cache.put_many(["a", "b"], np.zeros((2, 3), dtype=np.float32))
+    cache.conn.execute("UPDATE embeddings SET last_used = 0 WHERE key = ?", (cache.key("a"),))
+    cache.put_many(["c"], np.zeros((1, 3), dtype=np.float32))
+    assert cache.get_many(["a", "b", "c"])[0] is None
+    assert cache.get_many(["b", "c"])[0] is not None
@@ -0,0 +1,130 @@
+import conftest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+import pytest
+from numpy_sender import NumpyVectorDB
+from utils.numpy_store import NumpyStore
+
+
+@pytest.fixture
+def numpy_db(tmp_path):
+    """Fixture to initialize a NumpyVectorDB with a fake model."""
+    db = NumpyVectorDB(
+        path=tmp_path, env_name_index="INDEX_FORMATION",
+        index_col="id", other_cols=["nom_formation", "cp"]
+    )
+    db.model = MagicMock()
+    db.model.encode.side_effect = lambda texts, **kwargs: np.array(
+        [[1., 0.] if "info" in t else [0., 1.] for t in texts])
+    return db
+
+
+@pytest.fixture
+def formations():
+    return pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "nom_formation": ["Info", "Maths", "Info avancée"],
+        "cp": [["75001"], ["69001"], ["69002", "75002"]]
+    })
+
+
+def test_send_and_read(numpy_db, formations):
+    """Test that sent documents are skipped on a second load and read back without vectors."""
+    counts = numpy_db.send_batches([formations], col="nom_formation")
+    assert counts["indexed"] == 3
+    assert numpy_db.send_batches([formations], col="nom_formation")["skipped"] == 3
+    assert numpy_db.get_all_id_data() == {"a", "b", "c"}
+    df = numpy_db.get_data()
+    assert "vector_index" not in df.columns
+    assert df["nom_formation"].to_list() == ["Info", "Maths", "Info avancée"]
+
+
+def test_filtered_knn(numpy_db, formations):
+    """Test that the department filter is applied before the top-k selection."""
+    numpy_db.send_batches([formations], col="nom_formation")
+    df = numpy_db.get_data(settings_index={
+        "size": 2,
+        "_source": ["nom_formation"],
+        "query": {"knn": {"vector_index": {
+            "vector": [1., 0.], "k": 2,
+            "filter": {"prefix": {"cp": {"value": "69"}}}
+        }}}
+    })
+    assert df["nom_formation"].to_list() == ["Info avancée", "Maths"]
+    hits = numpy_db.search_knn(np.array([[1., 0.], [0., 1.]]), k=1)
+    assert [h[0]["_id"] for h in hits] == ["a", "b"]
+
+
+def test_update_and_reopen(numpy_db, formations, tmp_path):
+    """Test that updates are persisted and replayed when the store is reopened."""
+    numpy_db.send_batches([formations], col="nom_formation")
+    numpy_db.update_data(id_doc="b", params={"doc": {"nom_formation": "Statistiques"}})
+    reopened = NumpyStore(numpy_db.store.path)
+    assert reopened.ids == ["a", "b", "c"]
+    (row, _), = reopened.search([0., 2.], k=1)[0]
+    assert reopened.sources[row]["nom_formation"] == "Statistiques"
+    np.testing.assert_allclose(reopened.matrix[1], [0., 1.])
+
+
+def test_instances_share_store(numpy_db, formations, tmp_path):
+    """Test that the instances of an index share one store, which also sees
+    the records appended by another process."""
+    other = NumpyVectorDB(path=tmp_path, env_name_index="INDEX_FORMATION", other_cols=["cp"])
+    assert other.store is numpy_db.store
+    numpy_db.send_batches([formations], col="nom_formation")
+    assert other.get_all_id_data() == {"a", "b", "c"}
+
+    writer = NumpyStore(numpy_db.store.path)
+    writer.upsert(["d"], [{"nom_formation": "Droit", "cp": ["33000"]}], [[1., 1.]])
+    assert numpy_db.get_all_id_data() == {"a", "b", "c", "d"}
+    assert numpy_db.store.matrix.shape == (4, 2)
+
+
+def test_interrupted_write_is_recovered(tmp_path):
+    """Test that orphan vectors and a truncated record left by a crash do not
+    shift the rows of the next documents."""
+    store = NumpyStore(tmp_path / "store")
+    store.upsert(["a"], [{}], [[1., 0.]])
+    with open(store.vectors_path, "ab") as f:
+        f.write(np.array([[5., 5.]], dtype=np.float32).tobytes())
+    with open(store.documents_path, "ab") as f:
+        f.write(b'{"_id": "lost", "_ro')
+
+    reopened = NumpyStore(tmp_path / "store")
+    reopened.upsert(["b"], [{}], [[0., 1.]])
+    assert reopened.ids == ["a", "b"]
+    np.testing.assert_allclose(reopened.matrix, [[1., 0.], [0., 1.]])
+    assert NumpyStore(tmp_path / "store").ids == ["a", "b"]
+
+
+def test_log_is_compacted(tmp_path):
+    """Test that repeated updates compact the log, and that other stores reload it."""
+    store = NumpyStore(tmp_path / "store")
+    store.compact_ratio, store.compact_min_records = 1, 4
+    store.upsert(["a", "b"], [{"n": 0}, {"n": 0}], [[1., 0.], [0., 1.]])
+    reader = NumpyStore(tmp_path / "store")
+    for n in range(1, 4):
+        store.update("a", {"n": n})
+    assert len(store.documents_path.read_text().splitlines()) == 2
+    assert NumpyStore(tmp_path / "store").sources == [{"n": 3}, {"n": 0}]
+    reader.refresh()
+    assert reader.sources == [{"n": 3}, {"n": 0}]
+
+
+def test_reindex(numpy_db, formations, tmp_path):
+    """Test that reindex replaces the whole store, and keeps it if the load fails."""
+    numpy_db.send_batches([formations], col="nom_formation")
+    counts = numpy_db.reindex([formations[formations.id != "b"]], col="nom_formation")
+    assert counts["indexed"] == 2
+    assert numpy_db.get_all_id_data() == {"a", "c"}
+    assert [p.name for p in tmp_path.iterdir()] == [numpy_db.index_name_db]
+
+    def failing_batches():
+        yield formations
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        numpy_db.reindex(failing_batches(), col="nom_formation")
+    assert numpy_db.get_all_id_data() == {"a", "c"}
+    assert [p.name for p in tmp_path.iterdir()] == [numpy_db.index_name_db]
@@ -0,0 +1,29 @@
+import pytest
+import conftest
+import numpy as np
+from unittest.mock import MagicMock
+from utils.onnx_backend import check_parity, onnx_model, onnx_file_name
+
+
+def test_check_parity_accepts_close_vectors():
+    """Test that nearly identical vectors pass the parity check."""
+    reference, candidate = MagicMock(), MagicMock()
+    reference.encode.return_value = np.array([[1., 0.], [0., 1.]])
+    candidate.encode.return_value = np.array([[0.99, 0.01], [0.02, 1.01]])
+    assert check_parity(reference, candidate, sentences=["a", "b"]) > 0.98
+
+
+def test_check_parity_rejects_diverging_vectors():
+    """Test that a diverging candidate fails the parity check."""
+    reference, candidate = MagicMock(), MagicMock()
+    reference.encode.return_value = np.array([[1., 0.]])
+    candidate.encode.return_value = np.array([[0., 1.]])
+    with pytest.raises(ValueError):
+        check_parity(reference, candidate, sentences=["a"])
+
+
+def test_onnx_model_is_lazy():
+    """Test that the ONNX model targets the quantized graph without loading it."""
+    model = onnx_model("/tmp/model", "avx2")
+    assert model.kwargs["backend"] == "onnx"
+    assert model.kwargs["model_kwargs"]["file_name"] == onnx_file_name("avx2")
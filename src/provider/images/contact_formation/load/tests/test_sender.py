@@ -1,9 +1,16 @@
 import pytest
 import conftest
-from unittest.mock import patch
-from sentence_transformers import SentenceTransformer
+from contextlib import nullcontext
+from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
+import types
+import sys
+from opensearchpy.serializer import JSONSerializer
 from sender import SenderVectorDB
+from utils import model_registry
+from utils.model_registry import LazyModel
+from utils.embedding_cache import EmbeddingCache
 
 
 @pytest.fixture
@@ -23,7 +30,28 @@ def vector_db(mock_environment_variables):
 def test_initialization(vector_db):
     """Test class initialization with environment variables."""
     assert vector_db.index_name_db == "test_index"
-    assert isinstance(vector_db.model, SentenceTransformer)
+    assert isinstance(vector_db.model, LazyModel)
+
+
+def test_model_loaded_lazily_and_shared(monkeypatch):
+    """Test that the model is loaded on first encode, once per process."""
+    loaded = []
+
+    class FakeModel:
+        def __init__(self, name, **kwargs):
+            loaded.append(name)
+
+        def encode(self, texts, **kwargs):
+            return np.zeros((len(texts), 2))
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=FakeModel))
+    monkeypatch.setattr(model_registry, "_models", {})
+    model = LazyModel("fake-model")
+    assert loaded == []
+    model.encode(["a"])
+    LazyModel("fake-model").encode(["b"])
+    assert loaded == ["fake-model"]
 
 
 def test_add_vector(vector_db):
@@ -35,6 +63,93 @@ def test_add_vector(vector_db):
     assert len(result_df["vector_index"][0]) == vector_db.vector_dim
 
 
+def test_add_vector_batched(vector_db):
+    """Test that add_vector encodes the whole column in one batched call."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.ones((3, 4), dtype=np.float64)
+    df = pd.DataFrame({"text_column": ["A", "B", "C"]})
+    result_df = vector_db.add_vector(df, "text_column", batch_size=2)
+    vector_db.model.encode.assert_called_once()
+    args, kwargs = vector_db.model.encode.call_args
+    assert args[0] == ["a", "b", "c"]
+    assert kwargs["batch_size"] == 2
+    assert result_df["vector_index"][0].dtype == np.float32
+    assert vector_db.vector_dim == 4
+
+
+def test_add_vector_with_cache(vector_db, tmp_path):
+    """Test that add_vector only encodes the texts missing from the cache."""
+    vector_db.embedding_cache = EmbeddingCache(tmp_path / "cache.sqlite", model_name="test-model")
+    vector_db.embedding_cache.put_many(["a"], np.full((1, 4), 2, dtype=np.float32))
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.ones((1, 4), dtype=np.float32)
+    df = pd.DataFrame({"text_column": ["A", "B"]})
+    result_df = vector_db.add_vector(df, "text_column")
+    assert vector_db.model.encode.call_args[0][0] == ["b"]
+    assert result_df["vector_index"][0][0] == 2
+    assert result_df["vector_index"][1][0] == 1
+    vector_db.embedding_cache.close()
+
+
+def test_add_vector_deduplicates(vector_db):
+    """Test that identical texts are encoded once and broadcast to their rows."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode.return_value = np.array([[1., 0.], [0., 1.]])
+    df = pd.DataFrame({"text_column": ["Math", "Info", "math", "Math"]})
+    result_df = vector_db.add_vector(df, "text_column")
+    assert vector_db.model.encode.call_args[0][0] == ["math", "info"]
+    assert [v[0] for v in result_df["vector_index"]] == [1., 0., 1., 1.]
+
+
+def test_encode_with_pool(vector_db):
+    """Test that large inputs are sharded across the multi-process pool."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode_multi_process.return_value = np.ones((4, 2))
+    vector_db.pool = {"processes": [1, 2]}
+    vector_db.multi_process_min_texts = 3
+    matrix = vector_db.encode(["a", "b", "c", "d"])
+    vector_db.model.encode.assert_not_called()
+    assert vector_db.model.encode_multi_process.call_args[0][0] == ["a", "b", "c", "d"]
+    assert matrix.shape == (4, 2)
+    vector_db.stop_pool()
+    vector_db.model.stop_multi_process_pool.assert_called_once()
+    assert vector_db.pool is None
+
+
+@patch("opensearchpy.OpenSearch")
+def test_get_all_id_data(mock_opensearch, vector_db):
+    """Test that all IDs are streamed page by page on a point in time, without their source."""
+    db = mock_opensearch.return_value
+    db.create_pit.return_value = {"pit_id": "pit"}
+    db.search.side_effect = [
+        {"pit_id": "pit2", "hits": {"hits": [{"_id": "1", "sort": ["1"]}, {"_id": "2", "sort": ["2"]}]}},
+        {"pit_id": "pit2", "hits": {"hits": [{"_id": "3", "sort": ["3"]}]}}
+    ]
+    vector_db.db = mock_opensearch()
+    vector_db.scroll_size = 2
+    assert vector_db.get_all_id_data() == {"1", "2", "3"}
+    body = db.search.call_args.kwargs["body"]
+    assert body["_source"] is False
+    assert body["sort"] == [{"id": "asc"}]
+    assert body["search_after"] == ["2"]
+    assert body["pit"]["id"] == "pit2"
+    db.create_pit.assert_called_once_with(index="test_index", keep_alive="1m")
+    db.delete_pit.assert_called_once_with(body={"pit_id": ["pit2"]})
+
+
+@patch("opensearchpy.OpenSearch")
+def test_iter_hits_deletes_pit_when_closed(mock_opensearch, vector_db):
+    """Test that the point in time is deleted when the walk is left early."""
+    db = mock_opensearch.return_value
+    db.create_pit.return_value = {"pit_id": "pit"}
+    db.search.return_value = {"hits": {"hits": [{"_id": "1", "sort": ["1"]}]}}
+    vector_db.db = mock_opensearch()
+    hits = vector_db.iter_hits(size=1)
+    assert next(hits)["_id"] == "1"
+    hits.close()
+    db.delete_pit.assert_called_once_with(body={"pit_id": ["pit"]})
+
+
 @patch("opensearchpy.OpenSearch")
 def test_get_data(mock_opensearch, vector_db):
     """Test retrieval of data from the OpenSearch index."""
@@ -53,6 +168,27 @@ def test_get_data(mock_opensearch, vector_db):
     assert "nom_formation" in df.columns
 
 
+@patch("opensearchpy.OpenSearch")
+def test_iter_data_walks_whole_index(mock_opensearch, vector_db):
+    """Test that every page is read, chunked, and bounded by the memory budget."""
+    def page(start, n=2):
+        return {"hits": {"hits": [
+            {"_source": {"id": str(i)}, "sort": [str(i)]} for i in range(start, start + n)
+        ]}}
+    db = mock_opensearch.return_value
+    vector_db.db = mock_opensearch()
+    db.search.side_effect = [page(0, 3), page(3, 1)]
+    chunks = list(vector_db.iter_data(chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 1]
+
+    db.search.side_effect = [page(0), page(2), page(4, 0)]
+    assert vector_db.get_all_data(chunk_size=2)["id"].to_list() == ["0", "1", "2", "3"]
+
+    db.search.side_effect = [page(0), page(2), page(4, 0)]
+    with pytest.raises(MemoryError):
+        vector_db.get_all_data(chunk_size=2, max_bytes=1)
+
+
 @patch("opensearchpy.OpenSearch")
 def test_create_index(mock_opensearch, vector_db):
     """Test creation of an OpenSearch index with proper settings."""
@@ -62,19 +198,252 @@ def test_create_index(mock_opensearch, vector_db):
     vector_db.create_index()
     mock_opensearch.return_value.indices.create.assert_called_once()
 
+
+@patch("opensearchpy.OpenSearch")
+def test_create_index_hnsw_params(mock_opensearch, mock_environment_variables):
+    """Test that HNSW settings come from the configuration."""
+    vector_db = SenderVectorDB(
+        env_name_index="TEST_INDEX",
+        hnsw_params={"m": 32, "ef_construction": 256, "ef_search": None}
+    )
+    mock_opensearch.return_value.indices.exists.return_value = False
+    vector_db.db = mock_opensearch()
+    vector_db.create_index()
+    body = mock_opensearch.return_value.indices.create.call_args.kwargs["body"]
+    method = body["mappings"]["properties"]["vector_index"]["method"]
+    assert method["parameters"] == {"ef_construction": 256, "m": 32}
+    assert body["settings"]["index"]["knn.algo_param.ef_search"] == 100
+
+
+@patch("opensearchpy.OpenSearch")
+def test_create_index_field_types(mock_opensearch, mock_environment_variables):
+    """Test that codes are mapped as keyword and prose as text."""
+    vector_db = SenderVectorDB(
+        env_name_index="TEST_INDEX",
+        other_cols=["nom_formation", "cp", "url_fiche_formation"]
+    )
+    mock_opensearch.return_value.indices.exists.return_value = False
+    vector_db.db = mock_opensearch()
+    vector_db.create_index()
+    properties = mock_opensearch.return_value.indices.create.call_args.kwargs["body"]["mappings"]["properties"]
+    assert properties["cp"] == {"type": "keyword"}
+    assert properties["url_fiche_formation"] == {"type": "keyword"}
+    assert properties["nom_formation"] == {"type": "text"}
+    assert properties["content_hash"] == {"type": "keyword"}
+
+
+@patch("opensearchpy.OpenSearch")
+def test_vectors_not_in_source(mock_opensearch, mock_environment_variables):
+    """Test that vectors can be kept out of `_source` and are not read back by default."""
+    vector_db = SenderVectorDB(env_name_index="TEST_INDEX", vector_in_source=False)
+    db = mock_opensearch.return_value
+    db.indices.exists.return_value = False
+    db.search.return_value = {"hits": {"hits": []}}
+    vector_db.db = mock_opensearch()
+    vector_db.create_index()
+    body = db.indices.create.call_args.kwargs["body"]
+    assert body["mappings"]["_source"] == {"excludes": ["vector_index"]}
+    vector_db.get_data(settings_index={"query": {"match_all": {}}})
+    assert db.search.call_args.kwargs["body"]["_source"] == {"excludes": ["vector_index"]}
+
+
+@patch("opensearchpy.OpenSearch")
+def test_bulk_load_settings_restored(mock_opensearch, vector_db):
+    """Test that refresh and replicas are disabled during a bulk load then restored."""
+    db = mock_opensearch.return_value
+    db.indices.get_settings.return_value = {"test_index": {
+        "settings": {"index.number_of_replicas": "1"},
+        "defaults": {"index.refresh_interval": "1s"}
+    }}
+    vector_db.db = mock_opensearch()
+    with pytest.raises(RuntimeError):
+        with vector_db.bulk_load_settings(force_merge=True):
+            assert db.indices.put_settings.call_args.kwargs["body"]["index.refresh_interval"] == "-1"
+            raise RuntimeError("load failed")
+    assert db.indices.put_settings.call_args.kwargs["body"] == {
+        "index.refresh_interval": "1s", "index.number_of_replicas": "1"
+    }
+    db.indices.forcemerge.assert_called_once()
+
 @patch("opensearchpy.OpenSearch")
 def test_send_data(mock_opensearch, vector_db):
-    """Test sending data to the OpenSearch index."""
+    """Test sending data to the OpenSearch index through the bulk API."""
     mock_opensearch.return_value.indices.exists.return_value = True
-    mock_opensearch.return_value.search.return_value = {"hits": {"hits": []}}
+    mock_opensearch.return_value.search.return_value = {
+        "hits": {"hits": [{"_id": "3"}]}
+    }
+    mock_opensearch.return_value.transport.serializer = JSONSerializer()
+    mock_opensearch.return_value.bulk.return_value = {
+        "errors": True,
+        "items": [
+            {"index": {"_id": "1", "status": 201}},
+            {"index": {"_id": "2", "status": 400, "error": {"type": "mapper_parsing_exception"}}}
+        ]
+    }
     vector_db.db = mock_opensearch()
     vector_db.other_cols = ["nom_formation"]
 
     data = {
-        "id": ["1", "2"],
-        "vector_index": [[0.1] * 768, [0.2] * 768],
-        "nom_formation": ["Test 1", "Test 2"]
+        "id": ["1", "2", "3"],
+        "vector_index": [[0.1] * 768, [0.2] * 768, [0.3] * 768],
+        "nom_formation": ["Test 1", "Test 2", "Test 3"]
     }
     df = pd.DataFrame(data)
-    vector_db.send_data(df)
-    assert mock_opensearch.return_value.index.call_count == 2
+    counts = vector_db.send_data(df)
+    assert mock_opensearch.return_value.bulk.call_count == 1
+    assert mock_opensearch.return_value.index.call_count == 0
+    assert counts == {"indexed": 1, "updated": 0, "skipped": 1, "failed": 1}
+
+
+@patch("opensearchpy.OpenSearch")
+def test_send_batches(mock_opensearch, vector_db):
+    """Test that batches are embedded and sent one at a time, skipping known IDs."""
+    mock_opensearch.return_value.indices.exists.return_value = True
+    mock_opensearch.return_value.search.return_value = {
+        "hits": {"hits": [{"_id": "1"}]}
+    }
+    mock_opensearch.return_value.transport.serializer = JSONSerializer()
+    mock_opensearch.return_value.bulk.side_effect = lambda body, *args, **kwargs: {
+        "errors": False,
+        "items": [{"index": {"status": 201}} for _ in range(body.count("\n") // 2)]
+    }
+    vector_db.db = mock_opensearch()
+    vector_db.other_cols = ["domaine"]
+    vector_db.model = MagicMock()
+    vector_db.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 2))
+
+    batches = [
+        pd.DataFrame({"id": ["1", "2"], "domaine": ["Math", "Info"]}),
+        pd.DataFrame({"id": ["3"], "domaine": ["Droit"]})
+    ]
+    counts = vector_db.send_batches(iter(batches), col="domaine")
+    assert counts == {"indexed": 2, "updated": 0, "skipped": 1, "failed": 0}
+    assert mock_opensearch.return_value.bulk.call_count == 2
+    assert vector_db.model.encode.call_args_list[0][0][0] == ["info"]
+
+
+@patch("opensearchpy.OpenSearch")
+def test_send_batches_sync(mock_opensearch, vector_db):
+    """Test that sync mode only re-embeds documents whose content hash changed."""
+    vector_db.other_cols = ["domaine", "url"]
+    unchanged = pd.DataFrame({"id": ["1"], "domaine": ["Math"], "url": ["a"]})
+    stored_hash = vector_db.content_hash(unchanged).iloc[0]
+    mock_opensearch.return_value.indices.exists.return_value = True
+    mock_opensearch.return_value.search.return_value = {
+        "hits": {"hits": [
+            {"_id": "1", "_source": {"content_hash": stored_hash}},
+            {"_id": "2", "_source": {"content_hash": "old"}}
+        ]}
+    }
+    mock_opensearch.return_value.transport.serializer = JSONSerializer()
+    mock_opensearch.return_value.bulk.side_effect = lambda body, *args, **kwargs: {
+        "errors": False,
+        "items": [{"index": {"status": 200}} for _ in range(body.count("\n") // 2)]
+    }
+    vector_db.db = mock_opensearch()
+    vector_db.model = MagicMock()
+    vector_db.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 2))
+
+    df = pd.DataFrame({
+        "id": ["1", "2", "3"],
+        "domaine": ["Math", "Info", "Droit"],
+        "url": ["a", "new url", "c"]
+    })
+    counts = vector_db.send_batches(iter([df]), col="domaine", sync=True)
+    assert counts == {"indexed": 2, "updated": 1, "skipped": 1, "failed": 0}
+    assert vector_db.model.encode.call_args[0][0] == ["info", "droit"]
+    assert '"content_hash"' in mock_opensearch.return_value.bulk.call_args[0][0]
+
+
+@patch("opensearchpy.OpenSearch")
+def test_reindex_swaps_alias(mock_opensearch, vector_db):
+    """Test that reindex loads a new version, swaps the alias and prunes old versions."""
+    db = mock_opensearch.return_value
+    db.indices.exists.return_value = False
+    db.indices.exists_alias.return_value = True
+    db.indices.get_alias.return_value = {"test_index-v1": {}}
+    db.indices.get.return_value = {"test_index-v0": {}, "test_index-v1": {}, "test_index-v9": {}}
+    vector_db.db = mock_opensearch()
+    with patch.object(vector_db, "send_batches", return_value={"indexed": 1}) as send_batches, \
+            patch.object(vector_db, "warm_index") as warm_index:
+        vector_db.reindex(iter([]), col="domaine", keep_versions=2)
+    send_batches.assert_called_once()
+    warm_index.assert_called_once()
+    assert vector_db.index_name_db == "test_index"
+    actions = db.indices.update_aliases.call_args.kwargs["body"]["actions"]
+    assert actions[0] == {"remove": {"index": "test_index-v1", "alias": "test_index"}}
+    assert actions[-1]["add"]["alias"] == "test_index"
+    assert actions[-1]["add"]["index"].startswith("test_index-v")
+    db.indices.delete.assert_called_once_with(index="test_index-v0")
+
+
+@patch("opensearchpy.OpenSearch")
+def test_reindex_failure_keeps_alias(mock_opensearch, vector_db):
+    """Test that a failed load deletes the new version and leaves the alias untouched."""
+    db = mock_opensearch.return_value
+    vector_db.db = mock_opensearch()
+    with patch.object(vector_db, "send_batches", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            vector_db.reindex(iter([]), col="domaine")
+    db.indices.update_aliases.assert_not_called()
+    assert db.indices.delete.call_args.kwargs["index"].startswith("test_index-v")
+    assert vector_db.index_name_db == "test_index"
+
+
+@patch("opensearchpy.OpenSearch")
+def test_reindex_warms_without_vectors_in_source(mock_opensearch, vector_db):
+    """Test that the warm-up query reuses an encoded vector when `_source` has none."""
+    db = mock_opensearch.return_value
+    db.indices.exists.return_value = False
+    db.indices.exists_alias.return_value = False
+    db.indices.get.return_value = {}
+    vector_db.db = mock_opensearch()
+    vector_db.vector_in_source = False
+    vector_db.other_cols = ["domaine"]
+    vector_db.model = MagicMock()
+    vector_db.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 2))
+
+    df = pd.DataFrame({"id": ["1"], "domaine": ["Math"]})
+    with patch.object(vector_db, "get_all_id_data", return_value=set()), \
+            patch.object(vector_db, "_bulk_load_context", return_value=nullcontext()), \
+            patch.object(vector_db, "_bulk", return_value={"indexed": 1}):
+        vector_db.reindex(iter([df]), col="domaine", force_merge=False)
+
+    knn = db.search.call_args.kwargs["body"]["query"]["knn"]["vector_index"]
+    assert knn["vector"] == [1.0, 1.0]
+    db.indices.update_aliases.assert_called_once()
+
+
+def test_pool_started_lazily(vector_db):
+    """Test that a deferred pool is only started by an encode large enough to use it."""
+    vector_db.model = MagicMock()
+    vector_db.model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 2))
+    vector_db.model.start_multi_process_pool.return_value = {"processes": [1, 2]}
+    vector_db.model.encode_multi_process.return_value = np.ones((3, 2))
+    vector_db.start_pool(n_workers=2, lazy=True, min_texts=3)
+    vector_db.model.start_multi_process_pool.assert_not_called()
+
+    vector_db.encode(["a", "b"])
+    vector_db.model.start_multi_process_pool.assert_not_called()
+    vector_db.encode(["a", "b", "c"])
+    vector_db.model.start_multi_process_pool.assert_called_once()
+    vector_db.model.encode_multi_process.assert_called_once()
+    vector_db.stop_pool()
+
+
+@patch("opensearchpy.OpenSearch")
+def test_send_batches_skipped_never_loads_model(mock_opensearch, vector_db):
+    """Test that a run with nothing to encode does not load the model or the pool."""
+    mock_opensearch.return_value.indices.exists.return_value = True
+    vector_db.db = mock_opensearch()
+    vector_db.other_cols = ["domaine"]
+    vector_db.model = LazyModel("fake-model")
+    vector_db.start_pool(n_workers=4, lazy=True)
+    with patch.object(LazyModel, "load") as load, \
+            patch.object(vector_db, "get_all_id_data", return_value={"1", "2"}):
+        counts = vector_db.send_batches(
+            iter([pd.DataFrame({"id": ["1", "2"], "domaine": ["Math", "Info"]})]),
+            col="domaine")
+    assert counts["skipped"] == 2
+    load.assert_not_called()
+    assert vector_db.pool is None
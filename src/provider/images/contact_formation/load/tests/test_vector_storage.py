@@ -0,0 +1,37 @@
+import conftest
+import numpy as np
+import pytest
+from utils.vector_storage import knn_field, prepare_vectors
+
+
+def test_prepare_vectors_float32_unchanged():
+    """Test that the legacy storage keeps raw vectors."""
+    matrix = np.array([[3., 4.]])
+    np.testing.assert_array_equal(prepare_vectors(matrix, "float32"), matrix)
+
+
+def test_prepare_vectors_normalized():
+    """Test that vectors are scaled to unit norm."""
+    result = prepare_vectors(np.array([[3., 4.], [0., 0.]]), "normalized")
+    np.testing.assert_allclose(result, [[0.6, 0.8], [0., 0.]])
+    assert result.dtype == np.float32
+
+
+def test_prepare_vectors_byte():
+    """Test that byte storage quantizes unit vectors to clipped int8."""
+    result = prepare_vectors(np.array([[3., 4.]]), "byte", byte_scale=100)
+    assert result.dtype == np.int8
+    np.testing.assert_array_equal(result, [[60, 80]])
+    assert prepare_vectors(np.array([[1., 0.]]), "byte").max() == 127
+
+
+def test_knn_field():
+    """Test the mapping of each storage."""
+    assert knn_field("float32", 768)["space_type"] == "cosinesimil"
+    assert knn_field("normalized", 768)["space_type"] == "innerproduct"
+    fp16 = knn_field("fp16", 768)
+    assert fp16["method"]["engine"] == "faiss"
+    assert fp16["method"]["parameters"]["encoder"]["parameters"]["type"] == "fp16"
+    assert knn_field("byte", 768)["data_type"] == "byte"
+    with pytest.raises(ValueError):
+        knn_field("int4", 768)
@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import datetime
+from utils.cpu_quota import available_cpus
 import os
 import logging
 
@@ -29,3 +30,36 @@ else:
     date = datetime.now()
     data_path = Path("./data")
     logger.info("Run in local")
+
+embedding_cache_path = Path(os.environ.get(
+    "EMBEDDING_CACHE_PATH", data_path / "cache" / "embeddings.sqlite"))
+embedding_cache_max_entries = int(os.environ.get(
+    "EMBEDDING_CACHE_MAX_ENTRIES", 200_000))
+
+embedding_backend = os.environ.get("EMBEDDING_BACKEND", "torch")
+onnx_model_dir = Path(os.environ.get(
+    "ONNX_MODEL_DIR", data_path / "models" / "sentence-camembert-base-onnx"))
+onnx_quantization = os.environ.get("ONNX_QUANTIZATION", "avx2")
+encode_workers = int(os.environ.get("ENCODE_WORKERS", available_cpus()))
+load_batch_size = int(os.environ.get("LOAD_BATCH_SIZE", 2000))
+# Texts left to encode in a batch (deduplicated and missing from the cache)
+# from which the encoding pool is used
+multi_process_min_texts = int(os.environ.get(
+    "MULTI_PROCESS_MIN_TEXTS", max(load_batch_size // 4, 2)))
+load_mode = os.environ.get("LOAD_MODE", "incremental")
+keep_index_versions = int(os.environ.get("KEEP_INDEX_VERSIONS", 2))
+
+bulk_load = os.environ.get("BULK_LOAD", "false").lower() == "true"
+force_merge = os.environ.get("FORCE_MERGE", "false").lower() == "true"
+hnsw_params = {
+    "m": int(os.environ["HNSW_M"]) if "HNSW_M" in os.environ else None,
+    "ef_construction": int(os.environ["HNSW_EF_CONSTRUCTION"])
+    if "HNSW_EF_CONSTRUCTION" in os.environ else None,
+    "ef_search": int(os.environ["HNSW_EF_SEARCH"])
+    if "HNSW_EF_SEARCH" in os.environ else None,
+}
+vector_storage = os.environ.get("VECTOR_STORAGE", "float32")
+vector_in_source = os.environ.get("VECTOR_IN_SOURCE", "true").lower() == "true"
+
+vector_db_backend = os.environ.get("VECTOR_DB_BACKEND", "opensearch")
+vector_db_path = Path(os.environ.get("VECTOR_DB_PATH", data_path / "vector_db"))
@@ -0,0 +1,48 @@
+from pathlib import Path
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _cgroup_quota(root: Path):
+    """
+    Read the CPU quota of the cgroup as a number of CPUs, or None when unlimited.
+    """
+    try:
+        quota, period = (root / "cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> int:
+    """
+    Return the number of CPUs the process may use.
+
+    The Kubernetes CPU limit of the pod (cgroup v2 `cpu.max` or cgroup v1
+    `cpu.cfs_quota_us`) takes precedence over the CPUs visible to the process.
+
+    Args:
+        root (Path, optional): Mount point of the cgroup filesystem.
+
+    Returns:
+        int: At least 1.
+    """
+    n_cpus = len(os.sched_getaffinity(0))
+    quota = _cgroup_quota(root)
+    if quota is not None:
+        n_cpus = min(n_cpus, int(quota))
+    return max(1, n_cpus)
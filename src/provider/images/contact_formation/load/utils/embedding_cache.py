@@ -0,0 +1,162 @@
+from hashlib import sha256
+from pathlib import Path
+import logging
+import sqlite3
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    A persistent, size-bounded cache of sentence embeddings stored in SQLite.
+
+    Entries are content-addressed by the model name and the hash of the
+    normalized text, so a cache file can be shared between runs and models.
+    When the cache grows over `max_entries`, the least recently used entries
+    are evicted.
+
+    Attributes:
+        path (Path): Location of the SQLite file.
+        model_name (str): Name of the model producing the cached vectors.
+        max_entries (int): Maximum number of vectors kept on disk.
+        hits (int): Number of texts found in the cache.
+        misses (int): Number of texts missing from the cache.
+    """
+
+    chunk_size = 500
+
+    def __init__(self, path, model_name: str, max_entries: int = 200_000):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path (str | Path): Location of the SQLite file.
+            model_name (str): Name of the model producing the cached vectors.
+            max_entries (int, optional): Maximum number of vectors kept on disk.
+        """
+        self.path = Path(path)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+            "ON embeddings (last_used)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize a text before hashing: lowercase and collapse whitespaces.
+        """
+        return " ".join(str(text).lower().split())
+
+    def key(self, text: str) -> str:
+        """
+        Build the content address of a text for the current model.
+        """
+        return sha256(
+            f"{self.model_name}\0{self.normalize(text)}".encode()
+        ).hexdigest()
+
+    def get_many(self, texts: list) -> list:
+        """
+        Look up the vectors of several texts.
+
+        Args:
+            texts (list): Texts to look up.
+
+        Returns:
+            list: One float32 vector per text, or None when it is not cached.
+        """
+        keys = [self.key(t) for t in texts]
+        found = {}
+        for start in range(0, len(keys), self.chunk_size):
+            chunk = list(set(keys[start:start + self.chunk_size]))
+            rows = self.conn.execute(
+                "SELECT key, vector FROM embeddings WHERE key IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            found.update({k: np.frombuffer(v, dtype=np.float32) for k, v in rows})
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, k) for k in found]
+            )
+            self.conn.commit()
+        vectors = [found.get(k) for k in keys]
+        hits = sum(v is not None for v in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, texts: list, vectors: np.ndarray) -> None:
+        """
+        Store the vectors of several texts, then evict the oldest entries
+        if the cache is over capacity.
+
+        Args:
+            texts (list): Encoded texts.
+            vectors (np.ndarray): Matrix with one row per text.
+        """
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (self.key(t), self.model_name,
+                 np.asarray(v, dtype=np.float32).tobytes(), now)
+                for t, v in zip(texts, vectors)
+            ]
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries above `max_entries`.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return 0
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (overflow,)
+        )
+        self.conn.commit()
+        logger.info(f"Evicted {overflow} embeddings from cache")
+        return overflow
+
+    def log_stats(self) -> None:
+        """
+        Log the hit and miss counters of the cache.
+        """
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.
+        logger.info(
+            f"Embedding cache: {self.hits} hits, {self.misses} misses "
+            f"({ratio:.1%} hit rate)"
+        )
+
+    def close(self) -> None:
+        """
+        Close the SQLite connection.
+        """
+        self.conn.close()
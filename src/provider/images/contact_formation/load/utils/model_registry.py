@@ -0,0 +1,68 @@
+from typing import TYPE_CHECKING
+import logging
+import threading
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_model(model_name: str, **kwargs) -> "SentenceTransformer":
+    """
+    Return the process-wide SentenceTransformer of a model, loading it on first use.
+
+    `sentence_transformers` (and so torch) is only imported here, so modules
+    holding a model reference stay cheap to import.
+
+    Args:
+        model_name (str): Name or path of the pre-trained model.
+        **kwargs: Extra arguments given to the SentenceTransformer constructor.
+
+    Returns:
+        SentenceTransformer: The shared model instance.
+    """
+    key = (model_name, repr(sorted(kwargs.items())))
+    with _lock:
+        if key not in _models:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"Loading model {model_name}")
+            _models[key] = SentenceTransformer(model_name, **kwargs)
+        return _models[key]
+
+
+class LazyModel:
+    """
+    A stand-in for a SentenceTransformer that loads the shared model on first use.
+
+    Attributes:
+        model_name (str): Name or path of the pre-trained model.
+        kwargs (dict): Extra arguments given to the SentenceTransformer constructor.
+    """
+
+    def __init__(self, model_name: str, **kwargs):
+        self.model_name = model_name
+        self.kwargs = kwargs
+
+    def load(self) -> "SentenceTransformer":
+        """
+        Return the shared model, loading it if needed.
+        """
+        return get_model(self.model_name, **self.kwargs)
+
+    def encode(self, *args, **kwargs):
+        """
+        Encode texts with the shared model, see `SentenceTransformer.encode`.
+        """
+        return self.load().encode(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("model_name", "kwargs"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyModel({self.model_name!r})"
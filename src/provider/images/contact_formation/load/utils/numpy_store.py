@@ -0,0 +1,462 @@
+from datetime import date, datetime
+from pathlib import Path
+import json
+import logging
+import os
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_stores = {}
+_lock = threading.Lock()
+
+
+def get_store(path, vector_col: str = "vector_index") -> "NumpyStore":
+    """
+    Return the process-wide store of a directory, opening it on first use.
+
+    Every reader and writer of a directory shares the same in-memory state,
+    so documents written through one of them are seen by the others.
+
+    Args:
+        path (str | Path): Directory of the store.
+        vector_col (str, optional): Name of the vector field of the documents.
+
+    Returns:
+        NumpyStore: The store of the directory.
+    """
+    key = (str(Path(path).resolve()), vector_col)
+    with _lock:
+        if key not in _stores:
+            _stores[key] = NumpyStore(path, vector_col=vector_col)
+        return _stores[key]
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class NumpyStore:
+    """
+    An exact vector store kept on disk as a memory-mapped float32 matrix.
+
+    Vectors are L2-normalized and written to `vectors.f32` at the offset of
+    their row, one row per document, and documents are appended to
+    `documents.jsonl` with their row: writes cost O(batch) and, when the log
+    is replayed, the last record of an ID wins. Vectors left past the last
+    logged row by an interrupted write are overwritten by the next one, and
+    the log is compacted once it holds `compact_ratio` records per document.
+    Records appended by another process are replayed before each read.
+    Searches score every row with batched matrix products over the memory
+    map and select the top-k with `argpartition`.
+
+    Queries support the subset of the OpenSearch DSL used by the application:
+    `match_all`, `term`, `terms`, `match`, `prefix` and `bool` (`must`,
+    `filter`, `must_not`), plus a top-level `knn` clause with a `filter`.
+
+    Attributes:
+        path (Path): Directory of the store.
+        vector_col (str): Name of the vector field of the documents.
+        dimension (int): Dimensionality of the vectors.
+        ids (list): Document IDs, by row.
+        sources (list): Documents without their vector, by row.
+    """
+
+    block_rows = 16384
+    compact_ratio = 4
+    compact_min_records = 1000
+
+    def __init__(self, path, vector_col: str = "vector_index"):
+        """
+        Open the store in `path`, replaying its document log if it exists.
+
+        Args:
+            path (str | Path): Directory of the store.
+            vector_col (str, optional): Name of the vector field of the documents.
+        """
+        self.path = Path(path)
+        self.vector_col = vector_col
+        self.dimension = None
+        self.ids = []
+        self.sources = []
+        self.rows = {}
+        self._matrix = None
+        self._offset = 0
+        self._records = 0
+        self._log_inode = None
+        self.lock = threading.RLock()
+        if self.exists():
+            self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def documents_path(self) -> Path:
+        return self.path / "documents.jsonl"
+
+    def exists(self) -> bool:
+        return (self.path / "meta.json").exists()
+
+    def create(self, dimension: int) -> None:
+        """
+        Create an empty store for vectors of `dimension` components.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.write_bytes(b"")
+        self.documents_path.write_bytes(b"")
+        (self.path / "meta.json").write_text(json.dumps({"dimension": dimension}))
+        self.dimension = dimension
+        self.ids, self.sources, self.rows = [], [], {}
+        self._matrix = None
+        self._offset = self._records = 0
+        self._log_inode = self.documents_path.stat().st_ino
+        logger.info(f"Created numpy vector store in {self.path}")
+
+    def _load(self) -> None:
+        self.dimension = json.loads((self.path / "meta.json").read_text())["dimension"]
+        self.ids, self.sources, self.rows = [], [], {}
+        self._matrix = None
+        self._offset = self._records = 0
+        self._replay()
+        logger.info(f"Loaded {len(self.ids)} documents from {self.path}")
+
+    def _replay(self) -> None:
+        with open(self.documents_path, "rb") as f:
+            self._log_inode = os.fstat(f.fileno()).st_ino
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                self._records += 1
+                record = json.loads(line)
+                row = record["_row"]
+                if row == len(self.ids):
+                    self.ids.append(record["_id"])
+                    self.sources.append(record["_source"])
+                else:
+                    self.sources[row] = record["_source"]
+                self.rows[record["_id"]] = row
+
+    def refresh(self) -> None:
+        """
+        Replay the records appended to the document log since it was last read,
+        by another process or another store on the same directory. A log
+        compacted in the meantime is replayed from the start.
+        """
+        with self.lock:
+            if self.dimension is None:
+                if self.exists():
+                    self._load()
+                return
+            stat = self.documents_path.stat()
+            if stat.st_ino != self._log_inode or stat.st_size < self._offset:
+                self._load()
+            elif stat.st_size > self._offset:
+                self._replay()
+
+    def _truncate_log(self) -> None:
+        """
+        Drop an incomplete record left at the end of the log by an interrupted
+        write, so that the next records start on a new line.
+        """
+        if self.documents_path.stat().st_size > self._offset:
+            with open(self.documents_path, "r+b") as f:
+                f.truncate(self._offset)
+
+    def compact(self) -> None:
+        """
+        Rewrite the document log with one record per document, and swap it in
+        atomically.
+        """
+        with self.lock:
+            self.refresh()
+            tmp_path = self.documents_path.with_suffix(".jsonl.tmp")
+            with open(tmp_path, "wb") as f:
+                offset = sum(f.write(self._record(row)) for row in range(len(self.ids)))
+            os.replace(tmp_path, self.documents_path)
+            self._offset, self._records = offset, len(self.ids)
+            self._log_inode = self.documents_path.stat().st_ino
+            logger.info(f"Compacted the document log of {self.path}")
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        The memory-mapped matrix of the normalized vectors, one row per document.
+        """
+        if self._matrix is None or len(self._matrix) != len(self.ids):
+            if not self.ids:
+                return np.empty((0, self.dimension or 0), dtype=np.float32)
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r",
+                shape=(len(self.ids), self.dimension)
+            )
+        return self._matrix
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def replace_with(self, source) -> None:
+        """
+        Replace the content of the store with the store built in another
+        directory, and reload it.
+
+        The files are moved with `os.replace`, the document log last, so that
+        the stores of other processes reload the new content on their next read.
+
+        Args:
+            source (str | Path): Directory of the new store, emptied by the move.
+        """
+        source = Path(source)
+        with self.lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for path in (self.vectors_path, self.path / "meta.json", self.documents_path):
+                os.replace(source / path.name, path)
+            self._load()
+
+    def _record(self, row: int) -> bytes:
+        return (json.dumps(
+            {"_id": self.ids[row], "_row": row, "_source": self.sources[row]},
+            default=_json_default
+        ) + "\n").encode()
+
+    def _append_records(self, rows: list) -> None:
+        self._truncate_log()
+        with open(self.documents_path, "ab") as f:
+            for row in rows:
+                self._offset += f.write(self._record(row))
+                self._records += 1
+        if self._records > max(self.compact_min_records, self.compact_ratio * len(self.ids)):
+            self.compact()
+
+    def upsert(self, ids: list, sources: list, vectors) -> dict:
+        """
+        Insert documents, or overwrite the documents whose ID is already stored.
+        An empty store takes the dimension of the first vectors.
+
+        Args:
+            ids (list): Document IDs.
+            sources (list): Documents without their vector.
+            vectors (array-like): Matrix with one vector per document.
+
+        Returns:
+            dict: Counts of inserted and updated documents.
+        """
+        with self.lock:
+            self.refresh()
+            return self._upsert(ids, sources, self.normalize(vectors))
+
+    def _upsert(self, ids: list, sources: list, vectors: np.ndarray) -> dict:
+        if not self.ids and self.dimension != vectors.shape[1]:
+            self.create(vectors.shape[1])
+        first_row = len(self.ids)
+        new, known = [], []
+        for i, id_doc in enumerate(ids):
+            if id_doc in self.rows:
+                known.append(i)
+            else:
+                self.rows[id_doc] = len(self.ids)
+                self.ids.append(id_doc)
+                self.sources.append(sources[i])
+                new.append(i)
+        if new:
+            with open(self.vectors_path, "r+b") as f:
+                f.seek(first_row * self.dimension * vectors.itemsize)
+                f.write(np.ascontiguousarray(vectors[new]).tobytes())
+                f.truncate()
+        if known:
+            self._matrix = None
+            matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+",
+                shape=(len(self.ids), self.dimension)
+            )
+            rows = [self.rows[ids[i]] for i in known]
+            matrix[rows] = vectors[known]
+            matrix.flush()
+            for i in known:
+                self.sources[self.rows[ids[i]]] = sources[i]
+        self._matrix = None
+        self._append_records([self.rows[id_doc] for id_doc in ids])
+        return {"inserted": len(new), "updated": len(known)}
+
+    def update(self, id_doc, doc: dict) -> None:
+        """
+        Merge fields into a stored document.
+
+        Raises:
+            KeyError: If the document does not exist.
+        """
+        with self.lock:
+            self.refresh()
+            row = self.rows[id_doc]
+            self.sources[row] = {**self.sources[row], **doc}
+            self._append_records([row])
+
+    @classmethod
+    def _match_value(cls, value, predicate) -> bool:
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return any(cls._match_value(v, predicate) for v in value)
+        return value is not None and predicate(value)
+
+    def _matches(self, source: dict, query: dict) -> bool:
+        if not query:
+            return True
+        (name, clause), = query.items()
+        if name == "match_all":
+            return True
+        if name == "bool":
+            def clauses(key):
+                value = clause.get(key, [])
+                return value if isinstance(value, list) else [value]
+            return (
+                all(self._matches(source, q) for q in clauses("must") + clauses("filter"))
+                and not any(self._matches(source, q) for q in clauses("must_not"))
+            )
+        (field, value), = clause.items()
+        value_field = {"term": "value", "match": "query", "prefix": "value"}.get(name)
+        if isinstance(value, dict) and value_field:
+            value = value[value_field]
+        if name in ("term", "match"):
+            return self._match_value(source.get(field), lambda v: str(v) == str(value))
+        if name == "terms":
+            values = {str(v) for v in value}
+            return self._match_value(source.get(field), lambda v: str(v) in values)
+        if name == "prefix":
+            return self._match_value(source.get(field), lambda v: str(v).startswith(str(value)))
+        raise ValueError(f"Unsupported query {name!r} for the numpy vector store")
+
+    def mask(self, query: dict = None) -> np.ndarray:
+        """
+        Return the boolean mask of the rows matching a query.
+        """
+        self.refresh()
+        if not query or "match_all" in query:
+            return np.ones(len(self.ids), dtype=bool)
+        return np.fromiter(
+            (self._matches(s, query) for s in self.sources),
+            dtype=bool, count=len(self.sources)
+        )
+
+    def scores(self, vectors) -> np.ndarray:
+        """
+        Compute the cosine similarity of every row with each query vector.
+
+        Args:
+            vectors (array-like): One query vector, or a matrix of them.
+
+        Returns:
+            np.ndarray: Matrix of shape (number of documents, number of queries).
+        """
+        queries = self.normalize(vectors).T
+        matrix = self.matrix
+        scores = np.empty((len(matrix), queries.shape[1]), dtype=np.float32)
+        for start in range(0, len(matrix), self.block_rows):
+            end = start + self.block_rows
+            scores[start:end] = np.asarray(matrix[start:end]) @ queries
+        return scores
+
+    def search(self, vectors, k: int, query: dict = None) -> list:
+        """
+        Exact filtered top-k search of one or several query vectors.
+
+        Args:
+            vectors (array-like): One query vector, or a matrix of them.
+            k (int): Number of documents per query.
+            query (dict, optional): Filter restricting the candidate documents.
+
+        Returns:
+            list: For each query vector, a list of (row, cosine similarity)
+            sorted by decreasing similarity.
+        """
+        candidates = np.flatnonzero(self.mask(query))
+        scores = self.scores(vectors)[candidates]
+        k = min(k, len(candidates))
+        results = []
+        for column in scores.T:
+            if k == 0:
+                results.append([])
+                continue
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([(int(candidates[i]), float(column[i])) for i in top])
+        return results
+
+    def hit(self, row: int, cols=None, score: float = None) -> dict:
+        """
+        Build an OpenSearch-like hit of a row.
+
+        Args:
+            row (int): Row of the document.
+            cols (list | bool | dict, optional): `_source` filter, see `search_body`.
+            score (float, optional): Score of the hit.
+        """
+        hit = {"_id": self.ids[row]}
+        if score is not None:
+            hit["_score"] = score
+        if cols is False:
+            return hit
+        source = dict(self.sources[row])
+        source[self.vector_col] = self.matrix[row].tolist()
+        if isinstance(cols, dict):
+            source = {c: v for c, v in source.items() if c not in cols.get("excludes", [])}
+        elif cols is not None:
+            source = {c: source[c] for c in cols if c in source}
+        hit["_source"] = source
+        return hit
+
+    def hits(self, cols=None, query: dict = None):
+        """
+        Yield the hits of every document matching a query, in row order.
+        """
+        for row in np.flatnonzero(self.mask(query)):
+            yield self.hit(int(row), cols)
+
+    def search_body(self, body: dict) -> list:
+        """
+        Run an OpenSearch search body against the store.
+
+        A `knn` clause on the vector field, at the top of the query or in a
+        `bool.must` next to filters, becomes an exact filtered top-k search;
+        any other query is a plain filter.
+
+        Args:
+            body (dict): Search body with `query`, `size` and `_source`.
+
+        Returns:
+            list: OpenSearch-like hits.
+        """
+        query = body.get("query") or {"match_all": {}}
+        size = body.get("size", 10)
+        cols = body.get("_source")
+        knn, filters = None, []
+        if "knn" in query:
+            knn = query["knn"][self.vector_col]
+        elif "bool" in query:
+            must = query["bool"].get("must", [])
+            must = must if isinstance(must, list) else [must]
+            knn = next((q["knn"][self.vector_col] for q in must if "knn" in q), None)
+            if knn is not None:
+                extra = query["bool"].get("filter", [])
+                filters = [q for q in must if "knn" not in q] + (
+                    extra if isinstance(extra, list) else [extra])
+        if knn is None:
+            return [self.hit(int(row), cols) for row in np.flatnonzero(self.mask(query))[:size]]
+        if "filter" in knn:
+            filters.append(knn["filter"])
+        results = self.search(
+            knn["vector"], min(knn.get("k", size), size),
+            {"bool": {"must": filters}} if filters else None
+        )[0]
+        return [self.hit(row, cols, score) for row, score in results]
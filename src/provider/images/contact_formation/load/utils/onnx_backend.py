@@ -0,0 +1,142 @@
+from pathlib import Path
+import logging
+import numpy as np
+from utils.model_registry import LazyModel
+
+logger = logging.getLogger(__name__)
+
+PARITY_SAMPLE = [
+    "informatique",
+    "mathématiques appliquées",
+    "droit des affaires",
+    "sciences de l'éducation",
+    "génie civil et construction durable",
+    "management des organisations",
+    "biologie cellulaire et physiologie",
+    "langues étrangères appliquées",
+    "économie sociale et solidaire",
+    "sciences politiques",
+    "chimie des matériaux",
+    "information et communication",
+]
+
+
+def onnx_file_name(quantization_config: str) -> str:
+    """
+    Return the path, relative to the model directory, of a quantized ONNX graph.
+
+    Args:
+        quantization_config (str): One of "arm64", "avx2", "avx512" or "avx512_vnni".
+    """
+    return f"onnx/model_qint8_{quantization_config}.onnx"
+
+
+def onnx_model(model_dir, quantization_config: str = "avx2") -> LazyModel:
+    """
+    Return a lazily loaded model running a quantized ONNX graph on CPU.
+
+    Args:
+        model_dir (str | Path): Directory produced by `export_quantized_onnx`.
+        quantization_config (str, optional): Quantization config used at export.
+
+    Returns:
+        LazyModel: Model encoding with onnxruntime.
+    """
+    return LazyModel(
+        str(model_dir),
+        backend="onnx",
+        model_kwargs={
+            "file_name": onnx_file_name(quantization_config),
+            "provider": "CPUExecutionProvider"
+        }
+    )
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """
+    Compute the row-wise cosine similarity between two embedding matrices.
+    """
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
+
+
+def check_parity(reference_model, candidate_model, sentences: list = None,
+                 threshold: float = 0.98) -> float:
+    """
+    Check that a candidate model produces the same vectors as a reference one.
+
+    Args:
+        reference_model: Model producing the expected vectors (torch).
+        candidate_model: Model to validate (quantized ONNX).
+        sentences (list, optional): Fixed sample to encode. Defaults to `PARITY_SAMPLE`.
+        threshold (float, optional): Minimum cosine similarity accepted per sentence.
+
+    Returns:
+        float: The lowest cosine similarity over the sample.
+
+    Raises:
+        ValueError: If a sentence is below the threshold.
+    """
+    sentences = sentences or PARITY_SAMPLE
+    similarity = cosine_parity(
+        np.asarray(reference_model.encode(sentences), dtype=np.float32),
+        np.asarray(candidate_model.encode(sentences), dtype=np.float32)
+    )
+    worst = float(similarity.min())
+    logger.info(
+        f"ONNX parity: min cosine {worst:.4f}, mean cosine {similarity.mean():.4f}")
+    if worst < threshold:
+        raise ValueError(
+            f"ONNX model diverges from torch: min cosine {worst:.4f} < {threshold}")
+    return worst
+
+
+def export_quantized_onnx(model_name: str, model_dir, quantization_config: str = "avx2",
+                          threshold: float = 0.98) -> Path:
+    """
+    Export a model to ONNX, quantize it dynamically to int8 and validate it.
+
+    The export is skipped when the quantized graph already exists in `model_dir`.
+
+    Args:
+        model_name (str): Name of the pre-trained torch model.
+        model_dir (str | Path): Directory where the ONNX model is written.
+        quantization_config (str, optional): One of "arm64", "avx2", "avx512" or "avx512_vnni".
+        threshold (float, optional): Minimum cosine similarity against torch.
+
+    Returns:
+        Path: The model directory.
+
+    Raises:
+        ImportError: If `optimum[onnxruntime]` is not installed.
+        ValueError: If the quantized model fails the parity check.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model_dir = Path(model_dir)
+    if (model_dir / onnx_file_name(quantization_config)).exists():
+        logger.info(f"Quantized ONNX model already exported in {model_dir}")
+        return model_dir
+
+    logger.info(f"Exporting {model_name} to ONNX in {model_dir}")
+    onnx_fp32 = SentenceTransformer(model_name, backend="onnx")
+    onnx_fp32.save_pretrained(str(model_dir))
+    export_dynamic_quantized_onnx_model(
+        onnx_fp32,
+        quantization_config=quantization_config,
+        model_name_or_path=str(model_dir)
+    )
+    try:
+        check_parity(
+            reference_model=SentenceTransformer(model_name),
+            candidate_model=SentenceTransformer(
+                str(model_dir), backend="onnx",
+                model_kwargs={"file_name": onnx_file_name(quantization_config)}
+            ),
+            threshold=threshold
+        )
+    except ValueError:
+        (model_dir / onnx_file_name(quantization_config)).unlink()
+        raise
+    return model_dir
@@ -0,0 +1,81 @@
+import numpy as np
+
+# Storage of the knn_vector field:
+#   float32    - raw vectors scored with cosinesimil (legacy layout).
+#   normalized - unit vectors scored with innerproduct, no normalization at query time.
+#   fp16       - unit vectors stored by the faiss engine with a fp16 scalar quantizer.
+#   byte       - unit vectors scaled to int8 and stored as lucene byte vectors.
+VECTOR_STORAGES = ("float32", "normalized", "fp16", "byte")
+
+# Scale of the int8 quantization: components of unit vectors above
+# 127 / BYTE_SCALE in absolute value are clipped.
+BYTE_SCALE = 508.
+
+
+def check_storage(storage: str) -> str:
+    """
+    Validate the name of a vector storage.
+
+    Raises:
+        ValueError: If the storage is unknown.
+    """
+    if storage not in VECTOR_STORAGES:
+        raise ValueError(
+            f"Unknown vector storage {storage!r}, expected one of {VECTOR_STORAGES}")
+    return storage
+
+
+def knn_field(storage: str, dimension: int, m: int = 16,
+              ef_construction: int = 100) -> dict:
+    """
+    Build the mapping of a knn_vector field for a vector storage.
+
+    Args:
+        storage (str): One of `VECTOR_STORAGES`.
+        dimension (int): Dimensionality of the vectors.
+        m (int, optional): Number of neighbours per node of the HNSW graph.
+        ef_construction (int, optional): Size of the candidate list when building the graph.
+
+    Returns:
+        dict: Mapping of the field.
+    """
+    parameters = {"ef_construction": ef_construction, "m": m}
+    field = {"type": "knn_vector", "dimension": dimension}
+    if check_storage(storage) == "float32":
+        space_type, engine = "cosinesimil", "lucene"
+    elif storage == "fp16":
+        space_type, engine = "innerproduct", "faiss"
+        parameters["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+    else:
+        space_type, engine = "innerproduct", "lucene"
+        if storage == "byte":
+            field["data_type"] = "byte"
+    field["space_type"] = space_type
+    field["method"] = {"name": "hnsw", "engine": engine, "parameters": parameters}
+    return field
+
+
+def prepare_vectors(matrix: np.ndarray, storage: str,
+                    byte_scale: float = BYTE_SCALE) -> np.ndarray:
+    """
+    Turn encoder outputs into the vectors stored (or queried) for a storage.
+
+    Every storage but float32 L2-normalizes the rows, so that the inner
+    product equals the cosine similarity; byte storage then scales them to int8.
+
+    Args:
+        matrix (np.ndarray): Float matrix with one vector per row.
+        storage (str): One of `VECTOR_STORAGES`.
+        byte_scale (float, optional): Scale of the int8 quantization.
+
+    Returns:
+        np.ndarray: float32 matrix, or int8 matrix for byte storage.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if check_storage(storage) == "float32" or matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1, norms)
+    if storage == "byte":
+        return np.clip(np.rint(matrix * byte_scale), -128, 127).astype(np.int8)
+    return matrix
@@ -0,0 +1,103 @@
+"""
+Benchmark `clean_desc_str` against its former per-cell implementation.
+
+A synthetic catalogue is generated with HTML comments in the descriptions,
+CamelCase training names and responsible e-mail dicts, then both versions
+clean a copy of it and their throughput is reported in rows per second. The
+new version is also run on the catalogue with Arrow-backed string columns,
+as read with `dtype_backend="pyarrow"`.
+
+Usage (from the transform directory):
+    python benchmarks/bench_clean_desc_str.py --rows 100000
+"""
+from pathlib import Path
+import argparse
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from cleaner._clean import clean_desc_str, logger  # noqa: E402
+
+NAMES = ["MasterInformatique", "LicenceMathematiques", "BUTGenieCivil",
+         "DoctoratPhysiqueQuantique", "Master 2 DroitDesAffaires"]
+WORDS = ["formation", "étudiants", "projet", "stage", "cours", "recherche", "entreprise"]
+
+
+class Frame:
+    def __init__(self, df):
+        self.df = df
+
+
+def legacy_clean_desc_str(self):
+    pattern = r"<!--(.*?)-->"
+    for col in ["presentation_formation", "contenu_formation"]:
+        self.df[col] = self.df[col].map(
+            lambda x: re.sub(pattern, "", str(x), flags=re.DOTALL)
+        )
+    self.df.nom_formation = self.df.nom_formation.map(
+        lambda x: " ".join(re.split(r'(?<=[a-z])(?=[A-Z])', x))
+    )
+    self.df["mails"] = self.df.mail_responsables.map(
+        lambda x: list(x.values())
+    )
+
+
+def catalogue(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def texts():
+        words = rng.choice(WORDS, size=(rows, 40))
+        comment = rng.random(rows) < .5
+        return [
+            " ".join(w[:20]) + (" <!--\nwp:paragraph\n--> " if c else " ") + " ".join(w[20:])
+            for w, c in zip(words, comment)
+        ]
+
+    return pd.DataFrame({
+        "presentation_formation": texts(),
+        "contenu_formation": texts(),
+        "nom_formation": rng.choice(NAMES, size=rows),
+        "mail_responsables": [
+            {f"resp{j}": f"resp{j}.{i}@univ.fr" for j in range(n)}
+            for i, n in enumerate(rng.integers(1, 4, size=rows))
+        ],
+    })
+
+
+def throughput(func, df: pd.DataFrame, repeat: int) -> tuple:
+    best, frame = np.inf, None
+    for _ in range(repeat):
+        frame = Frame(df.copy())
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    return len(df) / best, frame.df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.disabled = True
+    df = catalogue(args.rows)
+    before, expected = throughput(legacy_clean_desc_str, df, args.repeat)
+    after, result = throughput(clean_desc_str, df, args.repeat)
+    pd.testing.assert_frame_equal(result, expected)
+    text_cols = ["presentation_formation", "contenu_formation", "nom_formation"]
+    arrow, _ = throughput(
+        clean_desc_str, df.astype({c: "string[pyarrow]" for c in text_cols}), args.repeat)
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"  before: {before:12,.0f} rows/s")
+    print(f"   after: {after:12,.0f} rows/s ({after / before:.1f}x)")
+    print(f"   arrow: {arrow:12,.0f} rows/s ({arrow / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
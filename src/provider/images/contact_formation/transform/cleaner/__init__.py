@@ -1,5 +1,8 @@
 import pandas as pd
 import logging
+from ._communes import CommunesTable
+from ._geocache import GeoCache
+from ._geocoder import GeocodingClient
 
 
 logger = logging.getLogger(__name__)
@@ -8,31 +11,68 @@ logger = logging.getLogger(__name__)
 class CleanerFormation:
     """
     A class to clean and transform a DataFrame containing training program data.
+
+    Attributes:
+        df (pd.DataFrame): The DataFrame being cleaned.
+        geocache (GeoCache): Optional persistent cache of postal code lookups.
+        geocoder (GeocodingClient): Optional concurrent client resolving the cities.
+        communes (CommunesTable): Optional offline table resolving the cities
+            before the online lookups.
+        responsables (pd.DataFrame): One row per (formation, responsable, email),
+            set by `format_columns`.
+        quarantine (pd.DataFrame): Rows left out because of malformed values,
+            set by `format_columns`.
     """
 
+    geocache = None
+    geocoder = None
+    communes = None
+    responsables = None
+    quarantine = None
+
     from ._filter import filter_data
     from ._transform import transform_data, add_cities, get_postal_code, compiler_degres_level,\
-        change_domaine, add_level, add_spe, add_id
+        change_domaine, add_level, add_spe, add_id, add_parsed_nom_formation
     from ._clean import clean_data, format_columns, clean_desc_str
 
     get_postal_code = staticmethod(get_postal_code)
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, geocache: GeoCache = None,
+                 geocoder: GeocodingClient = None, communes: CommunesTable = None):
         """
         Initialize the CleanerFormation object with a DataFrame.
 
         Args:
             df (pd.DataFrame): The input DataFrame to be cleaned and transformed.
+            geocache (GeoCache, optional): Persistent cache of postal code lookups.
+            geocoder (GeocodingClient, optional): Concurrent client resolving the cities.
+            communes (CommunesTable, optional): Offline table resolving the cities first.
         """
         self.df = df
+        if geocache is not None:
+            self.geocache = geocache
+        if geocoder is not None:
+            self.geocoder = geocoder
+        if communes is not None:
+            self.communes = communes
 
     def explode_by_responsable(self):
         """
         Expand rows to create one row per 'mail_responsables' and 'mails' entry.
         This ensures that each email is associated with its own row in the DataFrame.
+
+        The pairs come from `responsables` when `format_columns` built it,
+        'mail_responsables' then holding the name of the responsable.
         """
-        self.df = self.df.explode(["mail_responsables", "mails"])
-        self.df = self.df[(~self.df.mails.isna())]
+        if self.responsables is None:
+            self.df = self.df.explode(["mail_responsables", "mails"])
+            self.df = self.df[(~self.df.mails.isna())]
+        else:
+            pairs = self.responsables.set_index("formation") \
+                .rename(columns={"responsable": "mail_responsables", "email": "mails"})
+            columns = self.df.columns.union(pairs.columns, sort=False)
+            self.df = self.df.drop(columns=pairs.columns, errors="ignore") \
+                .join(pairs, how="inner")[columns]
         logger.info("Explode data done !")
 
     def __call__(self, subcols:list=None, *args, **kwds) -> pd.DataFrame:
@@ -47,7 +87,7 @@ class CleanerFormation:
             pd.DataFrame: The cleaned and transformed DataFrame.
         """
         self.clean_data(actions=["clean_desc_str"])
-        self.transform_data(actions=["add_cities", "add_spe", "change_domaine", "add_level"])
+        self.transform_data(actions=["add_cities", "parse_nom_formation"])
         self.filter_data()
         self.explode_by_responsable()
         self.transform_data(actions=["add_id"])
@@ -1,58 +1,163 @@
+from functools import lru_cache
+import ast
+import json
 import re
 import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 
 logger = logging.getLogger(__name__)
 
+# Patterns are written in the syntax shared by `re` and RE2, so that Arrow
+# backed columns can run them in the Arrow string kernels.
+HTML_COMMENT = re.compile(r"(?s)<!--.*?-->")
+CAMEL_CASE = re.compile(r"([a-z])([A-Z])")
+REMOVE_HTML_COMMENT_COLS = ["presentation_formation", "contenu_formation"]
+
+
+def _replace(col: pd.Series, pattern: re.Pattern, repl: str,
+             distinct: bool = False) -> pd.Series:
+    """
+    Replace a precompiled pattern in a string column.
+
+    Arrow backed columns use the Arrow regex kernel, other columns the pandas
+    string accessor. With `distinct`, the replacement only runs once per
+    distinct value, which pays off on low-cardinality columns.
+    """
+    if distinct:
+        codes, uniques = pd.factorize(col)
+        values = _replace(pd.Series(uniques, dtype=col.dtype), pattern, repl)
+        return pd.Series(
+            values.take(codes).to_numpy(), index=col.index, dtype=col.dtype
+        ).where(codes >= 0, col)
+    if _is_arrow(col.dtype):
+        return col.str.replace(pattern.pattern, repl, regex=True)
+    return col.str.replace(pattern, repl, regex=True)
+
+
+def _is_arrow(dtype) -> bool:
+    return isinstance(dtype, pd.ArrowDtype) or getattr(dtype, "storage", None) == "pyarrow"
+
 
 def clean_desc_str(self):
     """
     Perform cleaning of specific text fields in the DataFrame:
     1. Remove HTML comments from the 'presentation_formation' and 'contenu_formation' columns.
     2. Format the 'nom_formation' column by splitting camel case to improve readability.
-    3. Extract email addresses from dictionaries in the 'mail_responsables' column 
-       and store them in a new column called 'mails'.
+    3. Gather the email addresses of each formation from `responsables` (or else
+       from the dictionaries of the 'mail_responsables' column) into a new column 'mails'.
 
     Effects:
         - Modifies the columns 'presentation_formation', 'contenu_formation', and 'nom_formation'.
         - Adds a new column 'mails' containing a list of email addresses extracted from 'mail_responsables'.
     """
-    pattern = r"<!--(.*?)-->"
+    for col in REMOVE_HTML_COMMENT_COLS:
+        values = self.df[col]
+        if not _is_arrow(values.dtype):
+            values = values.astype(str)
+        self.df[col] = _replace(values, HTML_COMMENT, "")
+
+    self.df.nom_formation = _replace(
+        self.df.nom_formation, CAMEL_CASE, r"\1 \2", distinct=True)
+
+    responsables = getattr(self, "responsables", None)
+    if responsables is not None:
+        self.df["mails"] = _mails_by_formation(responsables, self.df.index)
+    else:
+        self.df["mails"] = [list(x.values()) for x in self.df.mail_responsables]
+    logger.info("Clean data done !")
 
-    remove_html_comment_col_list = [
-        "presentation_formation", "contenu_formation"
-    ]
 
-    for col in remove_html_comment_col_list:
-        self.df[col] = self.df[col].map(
-            lambda x: re.sub(pattern, "", str(x), flags=re.DOTALL)
-        )
+def _mails_by_formation(responsables: pd.DataFrame, index: pd.Index) -> pd.Series:
+    """
+    Gather the e-mails of `responsables` into one Arrow list per formation of
+    `index`, in the order of the responsables, without a Python loop.
+    """
+    rows = index.get_indexer(responsables["formation"])
+    kept = rows >= 0
+    order = np.argsort(rows[kept], kind="stable")
+    emails = pa.array(responsables["email"].to_numpy()[kept][order], type=pa.string())
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(rows[kept], minlength=len(index)))])
+    mails = pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), emails)
+    return pd.Series(pd.arrays.ArrowExtensionArray(mails), index=index)
+
+
+@lru_cache(maxsize=65536)
+def _parse_mail_responsables_str(value: str):
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return None
+    return _normalize_mail_responsables(parsed)
+
+
+def _normalize_mail_responsables(parsed):
+    if not isinstance(parsed, dict):
+        return None
+    if not all(isinstance(r, str) and isinstance(e, str) for r, e in parsed.items()):
+        return None
+    return tuple(parsed.items())
+
+
+def parse_mail_responsables(value):
+    """
+    Parse a 'mail_responsables' value without evaluating code.
 
-    self.df.nom_formation = self.df.nom_formation.map(
-        lambda x: " ".join(re.split(r'(?<=[a-z])(?=[A-Z])', x))
-    )
+    Strings are read as JSON, or else as a Python literal, and parses of
+    identical strings are cached. Names and e-mails are kept as they are, so
+    the 'mails' written downstream, and the content hashes computed from them
+    at load time, do not change.
 
-    self.df["mails"] = self.df.mail_responsables.map(
-        lambda x: list(x.values())
-    )
-    logger.info("Clean data done !")
+    Args:
+        value (str | dict): Stringified (or already parsed) dict of e-mails by responsable.
+
+    Returns:
+        tuple | None: (responsable, email) pairs, or None if the value is not
+            a dict of strings.
+    """
+    if isinstance(value, str):
+        return _parse_mail_responsables_str(value)
+    return _normalize_mail_responsables(value)
 
 
 def format_columns(self):
     """
     Convert the 'mail_responsables' column from stringified dictionaries to actual dictionaries.
-    
-    This transformation assumes that the column contains stringified Python dictionaries.
-    The `eval` function is used to parse these strings into actual dictionary objects.
 
-    Effects:
-        - Converts each value in the 'mail_responsables' column from a stringified dictionary 
-          to a proper Python dictionary.
+    Values are read with `parse_mail_responsables`, a JSON/literal parser, so
+    no code from the data is evaluated.
 
-    Warning:
-        - Using `eval` can be unsafe if the input data is not trusted. Make sure the source of 
-          the DataFrame is secure before applying this function.
+    Effects:
+        - Converts each value in the 'mail_responsables' column from a stringified dictionary
+          to a dictionary of e-mails by responsable.
+        - Sets `responsables`, a DataFrame with one row per (formation, responsable, email),
+          the formation being the index of its row in the DataFrame.
+        - Moves the rows whose value is malformed to `quarantine`, with a 'quarantine_reason'.
+
+    Logs:
+        - Logs a warning with the number of quarantined rows, if any.
     """
-    self.df.mail_responsables = self.df.mail_responsables.map(eval)
+    parsed = pd.Series(
+        [parse_mail_responsables(v) for v in self.df.mail_responsables],
+        index=self.df.index, dtype=object
+    )
+    malformed = parsed.isna()
+    self.quarantine = self.df[malformed].assign(quarantine_reason="malformed mail_responsables")
+    if malformed.any():
+        logger.warning(f"Quarantined {malformed.sum()} rows with malformed mail_responsables")
+
+    parsed = parsed[~malformed]
+    self.df = self.df[~malformed].copy()
+    self.df["mail_responsables"] = parsed.map(dict)
+    self.responsables = pd.DataFrame(
+        [(formation, responsable, email)
+         for formation, pairs in parsed.items() for responsable, email in pairs],
+        columns=["formation", "responsable", "email"]
+    )
     logger.debug("Format data done !")
 
 
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from pathlib import Path
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_cities(cities: pd.Series) -> pd.Series:
+    """
+    Normalize city names with vectorized string kernels, like `GeoCache.normalize`:
+    strip accents, lowercase, turn hyphens and apostrophes into spaces and
+    collapse whitespaces.
+    """
+    return (
+        cities.astype(str)
+        .str.normalize("NFKD")
+        .str.replace(r"[\u0300-\u036f]", "", regex=True)
+        .str.lower()
+        .str.replace(r"[-'’\s]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+class CommunesTable:
+    """
+    An offline commune → postal code table, loaded from a bundled CSV.
+
+    The file, built by `scripts/build_communes_table.py`, holds one row per
+    normalized commune name ("key") with its postal code ("postcode"); names
+    shared by several communes are left out, so they are resolved online.
+    Its version is the suffix of the file name.
+
+    Attributes:
+        path (Path): Location of the table.
+        version (str): Version of the table.
+        table (pd.DataFrame): Postal codes indexed by normalized commune name.
+    """
+
+    def __init__(self, path):
+        """
+        Load the table.
+
+        Args:
+            path (str | Path): Location of the CSV file (optionally gzipped).
+        """
+        self.path = Path(path)
+        self.version = self.path.name.split(".")[0].rsplit("_", 1)[-1]
+        self.table = pd.read_csv(self.path, dtype=str, usecols=["key", "postcode"]) \
+            .drop_duplicates("key")
+        logger.info(
+            f"Loaded {len(self.table)} communes from {self.path.name} (version {self.version})")
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def load(cls, path) -> "CommunesTable":
+        """
+        Return the table of a file, loading it once per process.
+        """
+        return cls(path)
+
+    def resolve(self, villes: list, fallback) -> dict:
+        """
+        Resolve 'ville' values to postal codes with a split/explode/merge on
+        the table, calling `fallback` for the cities it does not know.
+
+        Args:
+            villes (list): 'ville' values, each holding one or more comma-separated cities.
+            fallback (callable): Function taking a list of cities and returning
+                their postal codes by city.
+
+        Returns:
+            dict: Postal codes by 'ville' value, in the order of its cities.
+        """
+        cities = pd.Series(villes, dtype=object, name="ville").to_frame()
+        cities["city"] = cities["ville"].astype(str).str.split(",")
+        cities = cities.explode("city")
+        cities["city"] = cities["city"].str.strip()
+        cities = cities[cities["city"].fillna("") != ""]
+        cities["key"] = normalize_cities(cities["city"])
+        cities = cities.merge(self.table, on="key", how="left")
+
+        missing = cities.loc[cities["postcode"].isna(), "city"].drop_duplicates().to_list()
+        logger.info(
+            f"Communes table resolved {cities['postcode'].notna().sum()} of "
+            f"{len(cities)} cities, {len(missing)} left to the online resolver")
+        found = fallback(missing) if missing else {}
+        online = pd.Series(
+            [found.get(c, []) for c in cities["city"]], index=cities.index, dtype=object)
+        cities["postcodes"] = cities["postcode"].map(
+            lambda p: [p], na_action="ignore").fillna(online)
+        resolved = cities.groupby("ville", sort=False)["postcodes"].sum()
+        return {v: list(resolved.get(v, [])) for v in villes}
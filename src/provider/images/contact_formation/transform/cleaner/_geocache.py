@@ -0,0 +1,158 @@
+from pathlib import Path
+import json
+import logging
+import re
+import sqlite3
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+
+class GeoCache:
+    """
+    A persistent cache of city → postal codes lookups stored in SQLite.
+
+    Cities are keyed by their normalized name, so "Saint-Étienne" and
+    " saint etienne" share an entry. Found postal codes expire after `ttl`
+    seconds; cities the geocoder could not resolve are cached too (negative
+    caching) and retried after the shorter `negative_ttl`.
+
+    Attributes:
+        path (Path): Location of the SQLite file.
+        ttl (float): Lifetime in seconds of a resolved city.
+        negative_ttl (float): Lifetime in seconds of an unresolved city.
+        hits (int): Number of cities found in the cache.
+        misses (int): Number of cities missing from the cache or expired.
+    """
+
+    chunk_size = 500
+
+    def __init__(self, path, ttl: float = 90 * 86400, negative_ttl: float = 7 * 86400):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path (str | Path): Location of the SQLite file.
+            ttl (float, optional): Lifetime in seconds of a resolved city.
+            negative_ttl (float, optional): Lifetime in seconds of an unresolved city.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocoding ("
+            "key TEXT PRIMARY KEY, postcodes TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(city: str) -> str:
+        """
+        Normalize a city name: strip accents, lowercase, turn hyphens and
+        apostrophes into spaces and collapse whitespaces.
+        """
+        city = unicodedata.normalize("NFKD", str(city))
+        city = "".join(c for c in city if not unicodedata.combining(c))
+        return " ".join(re.sub(r"[-'’]", " ", city.lower()).split())
+
+    @staticmethod
+    def split(ville: str) -> list:
+        """
+        Split a 'ville' value holding a comma-separated list of cities.
+        """
+        return [c.strip() for c in str(ville).split(",") if c.strip()]
+
+    def get_many(self, cities: list) -> dict:
+        """
+        Look up the postal codes of several cities.
+
+        Args:
+            cities (list): City names.
+
+        Returns:
+            dict: Postal codes by city, for the cities cached and not expired.
+                Unresolved cities map to an empty list.
+        """
+        keys = {self.normalize(c): c for c in cities}
+        now = time.time()
+        found = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), self.chunk_size):
+            chunk = key_list[start:start + self.chunk_size]
+            rows = self.conn.execute(
+                "SELECT key, postcodes, updated_at FROM geocoding WHERE key IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for key, postcodes, updated_at in rows:
+                postcodes = json.loads(postcodes)
+                ttl = self.ttl if postcodes else self.negative_ttl
+                if now - updated_at < ttl:
+                    found[key] = postcodes
+        result = {c: found[self.normalize(c)] for c in cities if self.normalize(c) in found}
+        self.hits += len(result)
+        self.misses += len(cities) - len(result)
+        return result
+
+    def put_many(self, postcodes: dict) -> None:
+        """
+        Store the postal codes of several cities, an empty list marking an
+        unresolved city.
+
+        Args:
+            postcodes (dict): Postal codes by city.
+        """
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO geocoding (key, postcodes, updated_at) VALUES (?, ?, ?)",
+            [(self.normalize(c), json.dumps(list(p)), now) for c, p in postcodes.items()]
+        )
+        self.conn.commit()
+
+    def resolve(self, villes: list, lookup) -> dict:
+        """
+        Resolve 'ville' values to postal codes, calling `lookup` only for the
+        cities missing from the cache.
+
+        Args:
+            villes (list): 'ville' values, each holding one or more comma-separated cities.
+            lookup (callable): Function taking a list of cities and returning
+                their postal codes by city.
+
+        Returns:
+            dict: Postal codes by 'ville' value, in the order of its cities.
+        """
+        cities = list(dict.fromkeys(c for v in villes for c in self.split(v)))
+        known = self.get_many(cities)
+        missing = [c for c in cities if c not in known]
+        if missing:
+            fetched = lookup(missing)
+            self.put_many(fetched)
+            known.update(fetched)
+        self.log_stats()
+        return {
+            v: [p for c in self.split(v) for p in known.get(c, [])]
+            for v in villes
+        }
+
+    def log_stats(self) -> None:
+        """
+        Log the hit and miss counters of the cache.
+        """
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.
+        logger.info(
+            f"Geocoding cache: {self.hits} hits, {self.misses} misses "
+            f"({ratio:.1%} hit rate)"
+        )
+
+    def close(self) -> None:
+        """
+        Close the SQLite connection.
+        """
+        self.conn.close()
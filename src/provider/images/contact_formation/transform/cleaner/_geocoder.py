@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ._geocache import GeoCache
+
+logger = logging.getLogger(__name__)
+
+
+class GeocodingClient:
+    """
+    A concurrent client of the api-adresse.data.gouv.fr municipality search.
+
+    Requests share a pooled `requests.Session`, at most `max_workers` of them
+    are in flight, and 429/5xx responses are retried with exponential backoff
+    (honouring Retry-After).
+
+    Attributes:
+        url (str): Search endpoint.
+        max_workers (int): Maximum number of requests in flight.
+        timeout (float): Connect and read timeout of a request, in seconds.
+        session (requests.Session): Pooled session shared by the workers.
+    """
+
+    url = "https://api-adresse.data.gouv.fr/search/"
+
+    def __init__(self, url: str = None, max_workers: int = 8, timeout: float = 10,
+                 retries: int = 3, backoff_factor: float = 0.5):
+        """
+        Initialize the client and its session.
+
+        Args:
+            url (str, optional): Search endpoint.
+            max_workers (int, optional): Maximum number of requests in flight.
+            timeout (float, optional): Timeout of a request, in seconds.
+            retries (int, optional): Number of retries on errors, 429 and 5xx.
+            backoff_factor (float, optional): Base delay of the exponential backoff.
+        """
+        if url is not None:
+            self.url = url
+        self.max_workers = max_workers
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def postcodes(self, city: str) -> list:
+        """
+        Fetch the postal code of a city.
+
+        Args:
+            city (str): City name.
+
+        Returns:
+            list: The postal code of the best match, empty if the city is unknown.
+
+        Raises:
+            requests.RequestException: If the request still fails after the retries.
+        """
+        response = self.session.get(
+            self.url,
+            params={"q": city, "type": "municipality"},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        features = response.json().get("features", [])
+        if not features:
+            return []
+        return [features[0]["properties"]["postcode"]]
+
+    def lookup_many(self, cities: list) -> dict:
+        """
+        Fetch the postal codes of several cities in parallel.
+
+        Cities whose request failed are left out of the result, so that they
+        are not cached as unknown.
+
+        Args:
+            cities (list): City names.
+
+        Returns:
+            dict: Postal codes by city.
+        """
+        def fetch(city):
+            try:
+                return city, self.postcodes(city)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.error(f"Geocoding failed for city '{city}': {e}")
+                return city, None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(executor.map(fetch, cities))
+        failed = [c for c, p in results.items() if p is None]
+        logger.info(
+            f"Geocoded {len(cities) - len(failed)} cities, {len(failed)} failed")
+        return {c: p for c, p in results.items() if p is not None}
+
+    def resolve(self, villes: list) -> dict:
+        """
+        Resolve 'ville' values holding one or more comma-separated cities.
+
+        Args:
+            villes (list): 'ville' values.
+
+        Returns:
+            dict: Postal codes by 'ville' value, in the order of its cities.
+        """
+        cities = list(dict.fromkeys(c for v in villes for c in GeoCache.split(v)))
+        found = self.lookup_many(cities)
+        return {
+            v: [p for c in GeoCache.split(v) for p in found.get(c, [])]
+            for v in villes
+        }
+
+    def close(self) -> None:
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
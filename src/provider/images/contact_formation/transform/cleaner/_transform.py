@@ -1,14 +1,29 @@
 import requests
+import json
 import logging
 import re
 from hashlib import md5
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 compiler_degres_level = re.compile(
-    "(Master \d)|(Master)|(Licence \d)|(Licence)|(BUT)|(Module \d)|(Module)|(Doctorat)"
+    r"(Master \d)|(Master)|(Licence \d)|(Licence)|(BUT)|(Module \d)|(Module)|(Doctorat)"
 )
 
+# Level, text before the first "Parcours" and texts after the last "Parcours"
+# and "spécialité" of a 'nom_formation', extracted in a single match.
+compiler_nom_formation = re.compile(
+    r"(?s)^"
+    r"(?=(?:.*?(?P<niveau>Master \d|Master|Licence \d|Licence|BUT|Module \d|Module|Doctorat))?)"
+    r"(?=(?:.*spécialité(?P<specialite>.*))?)"
+    r"(?P<head>.*?)(?:Parcours(?:.*Parcours)?(?P<parcours>.*))?\Z"
+)
+
+# Parsed 'nom_formation' values, shared by the calls of `parse_nom_formation`.
+_parsed_noms = {}
+_parsed_noms_max_size = 100_000
+
 
 def get_postal_code(cities: str) -> list:
     """
@@ -28,8 +43,8 @@ def get_postal_code(cities: str) -> list:
     Logs:
         - Logs errors if the API request fails or if parsing the response fails.
 
-    Warning:
-        - This function uses `eval`, which can be unsafe if the API response is compromised.
+    Note:
+        - Requests are sequential; `GeocodingClient` resolves many cities in parallel.
     """
     if isinstance(cities, str) and cities.find(",") != -1:
         cities = cities.split(",")
@@ -42,9 +57,9 @@ def get_postal_code(cities: str) -> list:
             "q": c,
             "type": "municipality"
         }
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=10)
         try:
-            res = eval(response.content)["features"][0]["properties"]["postcode"]
+            res = json.loads(response.content)["features"][0]["properties"]["postcode"]
             li_post.append(res)
         except Exception:
             logger.error(response)
@@ -57,6 +72,12 @@ def add_cities(self) -> None:
 
     Behavior:
         - Maps cities in the 'ville' column to their postal codes using `get_postal_code`.
+        - When a `communes` table is set on the object, the cities are first
+          resolved offline from it; only the unknown ones are looked up online.
+        - When a `geocache` is set on the object, only the cities missing from
+          the cache (or expired) are looked up.
+        - When a `geocoder` is set on the object, the cities are looked up in
+          parallel by the `GeocodingClient`.
         - Adds a default value of "00000" for missing or NaN cities.
 
     Effects:
@@ -66,12 +87,86 @@ def add_cities(self) -> None:
         - Logs a debug message when the operation is completed.
     """
     import numpy as np
-    dico = {c: self.get_postal_code(c) for c in self.df.ville.dropna().unique().tolist()}
+    villes = self.df.ville.dropna().unique().tolist()
+    geocache = getattr(self, "geocache", None)
+    geocoder = getattr(self, "geocoder", None)
+    communes = getattr(self, "communes", None)
+
+    def resolve_online(villes):
+        if geocache is not None:
+            lookup = geocoder.lookup_many if geocoder is not None \
+                else lambda cities: {c: self.get_postal_code(c) for c in cities}
+            return geocache.resolve(villes, lookup)
+        if geocoder is not None:
+            return geocoder.resolve(villes)
+        return {c: self.get_postal_code(c) for c in villes}
+
+    if communes is not None:
+        dico = communes.resolve(villes, resolve_online)
+    else:
+        dico = resolve_online(villes)
     dico.update({k: ["00000"] for k in [None, np.nan]})
     self.df["cp"] = self.df.ville.map(lambda cities: dico[cities])
     logger.debug("CP Added !")
 
 
+def parse_nom_formation(noms: pd.Series) -> pd.DataFrame:
+    """
+    Parse 'nom_formation' values into their level, domain and specialization.
+
+    The distinct names missing from the memo are parsed with one regex
+    extraction, and the degree levels are removed from their domain with one
+    vectorized replacement; every row then reuses the parse of its name.
+
+    Args:
+        noms (pd.Series): 'nom_formation' values.
+
+    Returns:
+        pd.DataFrame: Columns 'niveau', 'domaine' and 'spécialisation', with
+            the index of `noms`. 'niveau' is the first degree level of the name
+            (empty if none), 'domaine' the text before "Parcours" without the
+            degree levels, and 'spécialisation' the text after the last
+            "Parcours", or else after the last "spécialité".
+    """
+    missing = [nom for nom in noms.dropna().unique() if nom not in _parsed_noms]
+    if missing:
+        parsed = pd.Series(missing, dtype=object).str.extract(compiler_nom_formation)
+        parsed["domaine"] = parsed["head"].str.replace(compiler_degres_level, "", regex=True)
+        spe = parsed["parcours"].where(parsed["parcours"].notna(), parsed["specialite"])
+        parsed["spécialisation"] = spe.where(spe.notna(), "")
+        parsed["niveau"] = parsed["niveau"].where(parsed["niveau"].notna(), "")
+        if len(_parsed_noms) + len(missing) > _parsed_noms_max_size:
+            _parsed_noms.clear()
+        _parsed_noms.update(zip(missing, zip(
+            parsed["niveau"], parsed["domaine"], parsed["spécialisation"])))
+    return pd.DataFrame(
+        [_parsed_noms.get(nom, (None, None, None)) for nom in noms],
+        columns=["niveau", "domaine", "spécialisation"],
+        index=noms.index
+    )
+
+
+def add_parsed_nom_formation(self) -> None:
+    """
+    Add the 'niveau', 'domaine' and 'spécialisation' columns parsed from the
+    'nom_formation' column, see `parse_nom_formation`.
+
+    Effects:
+        - Adds or updates the 'niveau', 'domaine' and 'spécialisation' columns.
+
+    Logs:
+        - Logs a debug message when the operation is successful.
+        - Logs an error message if 'nom_formation' is not in the DataFrame.
+    """
+    # FIXME: Attention il faut etre sur que ce soit Parcours qui sépare les deux
+    if "nom_formation" in self.df.columns:
+        parsed = parse_nom_formation(self.df.nom_formation)
+        self.df[parsed.columns] = parsed
+        logger.debug("Nom formation parsed !")
+    else:
+        logger.error("No col 'nom_formation' in df !")
+
+
 def change_domaine(self) -> None:
     """
     Extract the domain from the 'nom_formation' column.
@@ -87,10 +182,8 @@ def change_domaine(self) -> None:
         - Logs a debug message when the operation is successful.
         - Logs an error message if 'nom_formation' is not in the DataFrame.
     """
-    # FIXME: Attention il faut etre sur que ce soit Parcours qui sépare les deux
     if "nom_formation" in self.df.columns:
-        self.df["domaine"] = self.df.nom_formation.map(
-            lambda x: re.sub(compiler_degres_level, "", x.split("Parcours")[0]))
+        self.df["domaine"] = parse_nom_formation(self.df.nom_formation)["domaine"]
         logger.debug("Change domaine done !")
     else:
         logger.error("No col 'nom_formation' in df !")
@@ -111,14 +204,9 @@ def add_spe(self) -> None:
         - Logs a debug message when the operation is successful.
         - Logs an error message if 'nom_formation' is not in the DataFrame.
     """
-    # FIXME: Attention il faut etre sur que ce soit Parcours qui sépare les deux
     if "nom_formation" in self.df.columns:
-        self.df["spécialisation"] = self.df.nom_formation \
-            .map(
-                lambda x: x.split("Parcours")[-1] if x.find("Parcours") != -1
-                else "" if x.find("spécialité") == -1
-                else x.split("spécialité")[-1]
-            )
+        self.df["spécialisation"] = \
+            parse_nom_formation(self.df.nom_formation)["spécialisation"]
         logger.debug("Spé added")
     else:
         logger.error("No col 'nom_formation' in df !")
@@ -129,8 +217,8 @@ def add_level(self) -> None:
     Extract the degree level (e.g., 'Master', 'Licence') from the 'nom_formation' column.
 
     Behavior:
-        - Uses a regular expression to find degree levels in the text.
-        - Stores the extracted level in a new column 'niveau'.
+        - Uses a regular expression to find the first degree level in the text.
+        - Stores the extracted level in a new column 'niveau', empty if none.
 
     Effects:
         - Adds or updates the 'niveau' column in the DataFrame.
@@ -138,9 +226,7 @@ def add_level(self) -> None:
     Logs:
         - Logs a debug message when the operation is completed.
     """
-    self.df["niveau"] = self.df.nom_formation.map(
-        lambda x: re.findall(compiler_degres_level, x)) \
-        .map(lambda x: list(set(x[0]))[-1] if len(x) else x)
+    self.df["niveau"] = parse_nom_formation(self.df.nom_formation)["niveau"]
     logger.debug("Level Added")
 
 
@@ -170,6 +256,8 @@ def transform_data(self, actions: list = []) -> None:
     Parameters:
         actions (list): A list of transformation actions to apply. Supported actions:
             - "add_cities": Calls `add_cities` to add postal codes.
+            - "parse_nom_formation": Calls `add_parsed_nom_formation` to add the
+              specialization, domain and degree level at once.
             - "add_spe": Calls `add_spe` to add specialization information.
             - "change_domaine": Calls `change_domaine` to extract domain information.
             - "add_level": Calls `add_level` to extract degree levels.
@@ -181,6 +269,8 @@ def transform_data(self, actions: list = []) -> None:
     """
     if "add_cities" in actions:
         self.add_cities()
+    if "parse_nom_formation" in actions:
+        self.add_parsed_nom_formation()
     if "add_spe" in actions:
         self.add_spe()
     if "change_domaine" in actions:
@@ -1,10 +1,13 @@
 
-from utils.conf_env import date, data_path
+from utils.conf_env import date, data_path, geocoding_cache_path, \
+    geocoding_cache_ttl, geocoding_negative_ttl, geocoding_url, \
+    geocoding_max_workers, geocoding_timeout, geocoding_mode, communes_table_path
 import os
 import traceback
-from cleaner import CleanerFormation
+from cleaner import CleanerFormation, CommunesTable, GeoCache, GeocodingClient
+from cleaner._clean import REMOVE_HTML_COMMENT_COLS
+from utils.raw_data import read_raw_csv
 import logging
-import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +23,41 @@ def main(date):
             data_path, "processed", date)
 
         # Get data:
-        df_raw = pd.read_csv(data_raw_path)
-        cf = CleanerFormation(df=df_raw)
+        df_raw = read_raw_csv(data_raw_path, arrow_cols=REMOVE_HTML_COMMENT_COLS)
+        geocache = GeoCache(
+            geocoding_cache_path,
+            ttl=geocoding_cache_ttl,
+            negative_ttl=geocoding_negative_ttl
+        )
+        geocoder = GeocodingClient(
+            url=geocoding_url,
+            max_workers=geocoding_max_workers,
+            timeout=geocoding_timeout
+        )
+        communes = None
+        if geocoding_mode == "offline":
+            if communes_table_path is not None and communes_table_path.exists():
+                communes = CommunesTable.load(communes_table_path)
+            else:
+                logger.warning(
+                    f"No communes table at {communes_table_path}, geocoding online")
+        cf = CleanerFormation(
+            df=df_raw, geocache=geocache, geocoder=geocoder, communes=communes)
         sub_cols = ['id', 'nom_formation', 'domaine', 'niveau',
                     "spécialisation", 'mail_responsables', 'mails',
                     'universite', "cp",  "url"]
-        df_processed = cf(sub_cols)
+        try:
+            df_processed = cf(sub_cols)
+        finally:
+            geocache.close()
+            geocoder.close()
 
         os.makedirs(data_processed_path, exist_ok=True)
         df_processed.to_parquet(os.path.join(
             data_processed_path, "formations.parquet"))
+        if cf.quarantine is not None and len(cf.quarantine):
+            cf.quarantine.to_parquet(os.path.join(
+                data_processed_path, "quarantine.parquet"))
 
     except Exception:
         logger.error(traceback.format_exc())
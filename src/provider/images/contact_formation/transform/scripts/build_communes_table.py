@@ -0,0 +1,96 @@
+"""
+Build the offline commune → postal code table used by `CommunesTable`.
+
+The table is built from a dated export of the La Poste postal code database
+(hexasmal) and written to `reference/communes_postal_codes_<version>.csv.gz`,
+which is committed and copied into the image. The source of each version is
+pinned in `reference/sources.json` with its sha256, so that a version can
+always be rebuilt identically:
+
+    # Add a version, pinning the checksum of its source
+    python scripts/build_communes_table.py --version 2025-01 --pin <url of a dated export>
+    # Rebuild a pinned version, checking its source
+    python scripts/build_communes_table.py --version 2025-01
+
+Names shared by several communes are left out, so that they keep being
+resolved online; a commune with several postal codes keeps the lowest one,
+like the main postal code returned by the geocoding API.
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import io
+import json
+import sys
+import pandas as pd
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cleaner._communes import normalize_cities  # noqa: E402
+
+REFERENCE_DIR = Path(__file__).parent.parent / "reference"
+SOURCES_PATH = REFERENCE_DIR / "sources.json"
+
+
+def download(url: str) -> bytes:
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def build(content: bytes) -> pd.DataFrame:
+    """
+    Build the table from the hexasmal CSV.
+
+    Args:
+        content (bytes): Content of the hexasmal CSV.
+
+    Returns:
+        pd.DataFrame: One row per unambiguous normalized commune name, with
+            its postal code.
+    """
+    raw = pd.read_csv(io.BytesIO(content), sep=";", dtype=str, encoding="utf-8")
+    raw.columns = [c.strip().lstrip("#") for c in raw.columns]
+    communes = pd.DataFrame({
+        "insee": raw["Code_commune_INSEE"],
+        "key": normalize_cities(raw["Nom_de_la_commune"]),
+        "postcode": raw["Code_postal"].str.zfill(5),
+    }).dropna()
+    ambiguous = communes.groupby("key")["insee"].nunique() > 1
+    communes = communes[~communes["key"].isin(ambiguous[ambiguous].index)]
+    return communes.groupby("key", as_index=False)["postcode"].min() \
+        .sort_values("key", ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--version", required=True, help="Version of the table.")
+    parser.add_argument(
+        "--pin", metavar="URL",
+        help="Dated source of a new version, whose sha256 is added to sources.json.")
+    args = parser.parse_args()
+
+    sources = json.loads(SOURCES_PATH.read_text())
+    if args.pin:
+        if args.version in sources:
+            parser.error(f"version {args.version} is already pinned")
+        content = download(args.pin)
+        sources[args.version] = {
+            "url": args.pin, "sha256": hashlib.sha256(content).hexdigest()}
+    elif args.version in sources:
+        content = download(sources[args.version]["url"])
+        sha256 = hashlib.sha256(content).hexdigest()
+        if sha256 != sources[args.version]["sha256"]:
+            sys.exit(
+                f"Source of version {args.version} changed: sha256 {sha256}, "
+                f"pinned {sources[args.version]['sha256']}")
+    else:
+        parser.error(f"version {args.version} is not pinned in {SOURCES_PATH}, use --pin")
+
+    table = build(content)
+    output = REFERENCE_DIR / f"communes_postal_codes_{args.version}.csv.gz"
+    # A fixed mtime keeps the gzip output byte-identical across rebuilds
+    table.to_csv(output, index=False, compression={"method": "gzip", "mtime": 0})
+    SOURCES_PATH.write_text(json.dumps(sources, indent=4, sort_keys=True) + "\n")
+    print(f"Wrote {len(table)} communes to {output}")
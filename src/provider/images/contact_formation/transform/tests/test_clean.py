@@ -91,3 +91,80 @@ def test_clean_data():
     assert mock_obj.df["contenu_formation"].tolist() == expected_contenu
     assert mock_obj.df["nom_formation"].tolist() == expected_nom
     assert mock_obj.df["mails"].tolist() == expected_mails
+
+
+def test_clean_desc_str_arrow_columns():
+    data = {
+        "presentation_formation": ["Welcome <!--HTML\ncomment--> to the course"],
+        "contenu_formation": ["Content here"],
+        "nom_formation": ["MasterInformatique"],
+        "mail_responsables": [{"resp1": "email1@example.com"}]
+    }
+    df = pd.DataFrame(data).astype({
+        "presentation_formation": "string[pyarrow]",
+        "contenu_formation": "string[pyarrow]",
+        "nom_formation": "string[pyarrow]",
+    })
+    mock_obj = MockDataFrameClass(df)
+
+    clean_desc_str(mock_obj)
+
+    assert mock_obj.df["presentation_formation"].tolist() == ["Welcome  to the course"]
+    assert mock_obj.df["nom_formation"].tolist() == ["Master Informatique"]
+    assert mock_obj.df["nom_formation"].dtype == "string[pyarrow]"
+
+
+def test_format_columns_quarantines_malformed_rows():
+    data = {
+        "nom_formation": ["A", "B", "C", "D"],
+        "mail_responsables": [
+            '{"resp1": " Email1@Example.com "}',
+            "__import__('os').system('echo unsafe')",
+            "{'resp1': 'email1@example.com', 'resp2': ''}",
+            None,
+        ]
+    }
+    mock_obj = MockDataFrameClass(pd.DataFrame(data))
+
+    format_columns(mock_obj)
+
+    assert mock_obj.df["mail_responsables"].tolist() == [
+        {"resp1": " Email1@Example.com "}, {"resp1": "email1@example.com", "resp2": ""}]
+    assert mock_obj.quarantine["nom_formation"].tolist() == ["B", "D"]
+    assert mock_obj.responsables.values.tolist() == [
+        [0, "resp1", " Email1@Example.com "],
+        [2, "resp1", "email1@example.com"],
+        [2, "resp2", ""]]
+
+
+def test_parse_mail_responsables_is_cached():
+    from cleaner._clean import _parse_mail_responsables_str, parse_mail_responsables
+    _parse_mail_responsables_str.cache_clear()
+    for _ in range(3):
+        assert parse_mail_responsables("{'resp1': 'a@b.fr'}") == (("resp1", "a@b.fr"),)
+    assert _parse_mail_responsables_str.cache_info().hits == 2
+
+
+def test_explode_by_responsable_uses_responsables():
+    from cleaner import CleanerFormation
+    df = pd.DataFrame({
+        "nom_formation": ["A", "B", "C", "D"],
+        "presentation_formation": ["p"] * 4,
+        "contenu_formation": ["c"] * 4,
+        "mail_responsables": [
+            "{'x': 'e1', 'y': 'e2'}", "{}", "{'z': ''}", "{'w': 'e4'}"],
+    })
+    exploded = []
+    for use_responsables in (True, False):
+        cf = CleanerFormation(df.copy())
+        cf.clean_data(actions=["clean_desc_str"])
+        cf.df = cf.df[cf.df.nom_formation != "D"]
+        if not use_responsables:
+            cf.responsables = None
+        cf.explode_by_responsable()
+        exploded.append(cf.df)
+
+    assert exploded[0]["mail_responsables"].tolist() == ["x", "y", "z"]
+    assert exploded[0]["mails"].tolist() == ["e1", "e2", ""]
+    assert exploded[0].index.tolist() == [0, 0, 2]
+    pd.testing.assert_frame_equal(exploded[0], exploded[1], check_dtype=False)
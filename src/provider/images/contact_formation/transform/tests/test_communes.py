@@ -0,0 +1,74 @@
+import pandas as pd
+from unittest.mock import MagicMock
+from cleaner._communes import CommunesTable, normalize_cities
+from cleaner._geocache import GeoCache
+from cleaner._transform import add_cities
+
+
+class MockDataFrameClass:
+    def __init__(self, df, communes):
+        self.df = df
+        self.communes = communes
+        self.get_postal_code = MagicMock(
+            side_effect=lambda c: {"Brest": ["29200"]}.get(c, []))
+
+
+def write_table(tmp_path):
+    path = tmp_path / "communes_postal_codes_2024.csv.gz"
+    pd.DataFrame({
+        "key": ["paris", "saint etienne", "l isle d abeau"],
+        "postcode": ["75001", "42000", "38080"],
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_normalize_cities_matches_geocache():
+    cities = pd.Series(["  Saint-Étienne ", "L'Isle-d'Abeau", "ŒUILLY"])
+    assert normalize_cities(cities).tolist() == [GeoCache.normalize(c) for c in cities]
+
+
+def test_load_once(tmp_path):
+    path = write_table(tmp_path)
+    table = CommunesTable.load(path)
+    assert CommunesTable.load(path) is table
+    assert table.version == "2024"
+
+
+def test_resolve_falls_back_for_unknown_cities(tmp_path):
+    table = CommunesTable(write_table(tmp_path))
+    fallback = MagicMock(side_effect=lambda cities: {"Brest": ["29200"]})
+    result = table.resolve(["PARIS", "Saint Étienne, Brest", "Nowhere"], fallback)
+    assert result == {
+        "PARIS": ["75001"],
+        "Saint Étienne, Brest": ["42000", "29200"],
+        "Nowhere": [],
+    }
+    fallback.assert_called_once_with(["Brest", "Nowhere"])
+
+
+def test_add_cities_offline(tmp_path):
+    table = CommunesTable(write_table(tmp_path))
+    mock = MockDataFrameClass(
+        pd.DataFrame({"ville": ["Paris", "L'Isle-d'Abeau, Brest", None]}), table)
+    add_cities(mock)
+    assert mock.df["cp"].tolist() == [["75001"], ["38080", "29200"], ["00000"]]
+    mock.get_postal_code.assert_called_once_with("Brest")
+
+
+def test_build_communes_table():
+    import importlib.util
+    from pathlib import Path
+    spec = importlib.util.spec_from_file_location(
+        "build_communes_table",
+        Path(__file__).parent.parent / "scripts" / "build_communes_table.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    content = (
+        "#Code_commune_INSEE;Nom_de_la_commune;Code_postal;Libellé_d_acheminement\n"
+        "42218;SAINT ETIENNE;42100;SAINT ETIENNE\n"
+        "42218;SAINT ETIENNE;42000;SAINT ETIENNE\n"
+        "01001;SAINTE FOY;01000;SAINTE FOY\n"
+        "69001;SAINTE FOY;69110;SAINTE FOY\n"
+    ).encode()
+    table = module.build(content)
+    assert table.values.tolist() == [["saint etienne", "42000"]]
@@ -0,0 +1,54 @@
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from cleaner._geocache import GeoCache
+from cleaner._transform import add_cities
+
+
+class MockDataFrameClass:
+    def __init__(self, df, geocache):
+        self.df = df
+        self.geocache = geocache
+        self.get_postal_code = MagicMock(
+            side_effect=lambda c: {"Paris": ["75001"], "Lyon": ["69001"]}.get(c, []))
+
+
+def test_normalize():
+    assert GeoCache.normalize("  Saint-Étienne ") == GeoCache.normalize("saint etienne")
+
+
+def test_resolve_only_looks_up_missing_cities(tmp_path):
+    cache = GeoCache(tmp_path / "geo.sqlite")
+    lookup = MagicMock(side_effect=lambda cities: {c: ["75001"] for c in cities})
+    assert cache.resolve(["Paris"], lookup) == {"Paris": ["75001"]}
+
+    reopened = GeoCache(tmp_path / "geo.sqlite")
+    result = reopened.resolve(["PARIS", "Paris, Lyon"], lookup)
+    assert result == {"PARIS": ["75001"], "Paris, Lyon": ["75001", "75001"]}
+    assert lookup.call_args_list[-1].args[0] == ["Lyon"]
+    assert reopened.hits == 2
+
+
+def test_ttl_and_negative_caching(tmp_path):
+    cache = GeoCache(tmp_path / "geo.sqlite", ttl=100, negative_ttl=10)
+    with patch("cleaner._geocache.time.time", return_value=1000):
+        cache.put_many({"Paris": ["75001"], "Nowhere": []})
+    with patch("cleaner._geocache.time.time", return_value=1005):
+        assert cache.get_many(["Paris", "Nowhere"]) == {"Paris": ["75001"], "Nowhere": []}
+    with patch("cleaner._geocache.time.time", return_value=1050):
+        assert cache.get_many(["Paris", "Nowhere"]) == {"Paris": ["75001"]}
+    with patch("cleaner._geocache.time.time", return_value=1200):
+        assert cache.get_many(["Paris"]) == {}
+
+
+def test_add_cities_with_cache(tmp_path):
+    df = pd.DataFrame({"ville": ["Paris", "Lyon", "InvalidCity", None, "Paris"]})
+    mock_obj = MockDataFrameClass(df, GeoCache(tmp_path / "geo.sqlite"))
+    add_cities(mock_obj)
+    assert mock_obj.df["cp"].tolist() == [["75001"], ["69001"], [], ["00000"], ["75001"]]
+
+    assert mock_obj.get_postal_code.call_count == 3
+
+    second_run = MockDataFrameClass(df, mock_obj.geocache)
+    add_cities(second_run)
+    second_run.get_postal_code.assert_not_called()
+    assert second_run.df["cp"].tolist() == mock_obj.df["cp"].tolist()
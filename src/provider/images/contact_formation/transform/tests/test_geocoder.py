@@ -0,0 +1,78 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import pandas as pd
+import pytest
+from cleaner._geocoder import GeocodingClient
+from cleaner._transform import add_cities
+
+POSTCODES = {"Paris": "75001", "Lyon": "69001", "Marseille": "13001"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stub of the municipality search: Lyon is throttled once, Crash always fails."""
+
+    calls = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query)["q"][0]
+        with self.lock:
+            self.calls[city] = self.calls.get(city, 0) + 1
+            count = self.calls[city]
+        if city == "Lyon" and count == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if city == "Crash":
+            self.send_response(503)
+            self.end_headers()
+            return
+        features = []
+        if city in POSTCODES:
+            features = [{"properties": {"postcode": POSTCODES[city]}}]
+        body = json.dumps({"features": features}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.calls = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_lookup_many_retries_and_skips_failures(stub_url):
+    client = GeocodingClient(url=stub_url, max_workers=4, retries=2, backoff_factor=0)
+    result = client.lookup_many(["Paris", "Lyon", "Nowhere", "Crash"])
+    client.close()
+    assert result == {"Paris": ["75001"], "Lyon": ["69001"], "Nowhere": []}
+    assert StubHandler.calls["Lyon"] == 2
+    assert StubHandler.calls["Crash"] == 3
+
+
+class MockDataFrameClass:
+    def __init__(self, df, geocoder):
+        self.df = df
+        self.geocoder = geocoder
+
+
+def test_add_cities_with_geocoder(stub_url):
+    df = pd.DataFrame({"ville": ["Paris", "Marseille,Paris", None]})
+    mock_obj = MockDataFrameClass(df, GeocodingClient(url=stub_url, backoff_factor=0))
+    add_cities(mock_obj)
+    assert mock_obj.df["cp"].tolist() == [["75001"], ["13001", "75001"], ["00000"]]
+    assert StubHandler.calls["Paris"] == 1
@@ -0,0 +1,19 @@
+import pandas as pd
+from utils.raw_data import read_raw_csv
+
+
+def test_read_raw_csv(tmp_path):
+    path = tmp_path / "formations.csv"
+    path.write_text(
+        "nom_formation,presentation_formation,ville,created_at,empty,n\n"
+        'Master Info,"Welcome\n<!--x--> here",Paris,2024-01-01,,1\n'
+        "Licence Math,,,2024-01-02,,\n"
+    )
+    df = read_raw_csv(path, arrow_cols=["presentation_formation"])
+    expected = pd.read_csv(path)
+
+    assert df["presentation_formation"].dtype == "string[pyarrow]"
+    assert df["presentation_formation"][0] == "Welcome\n<!--x--> here"
+    assert df.columns.tolist() == expected.columns.tolist()
+    other = [c for c in expected.columns if c != "presentation_formation"]
+    pd.testing.assert_frame_equal(df[other], expected[other])
@@ -3,7 +3,8 @@ import requests
 import pandas as pd
 from unittest.mock import patch, MagicMock
 from cleaner._transform import get_postal_code, add_cities, \
-    change_domaine, add_spe, add_level, add_id, transform_data
+    change_domaine, add_spe, add_level, add_id, transform_data, \
+    add_parsed_nom_formation, parse_nom_formation
 from hashlib import md5
 
 # Mock logger to avoid real logging during tests
@@ -114,3 +115,35 @@ def test_transform_data():
     assert "domaine" in mock_obj.df.columns
     assert "niveau" in mock_obj.df.columns
     assert "id" in mock_obj.df.columns
+
+
+def test_add_parsed_nom_formation():
+    data = {"nom_formation": [
+        "Master 2 Informatique Parcours IA",
+        "Licence Math spécialité Analyse",
+        "Diplôme Universitaire",
+        "Master 2 Informatique Parcours IA",
+        "Master 2MasterBUT\n",
+        "Licence Parcours Info\n",
+    ]}
+    mock_obj = MockDataFrameClass(pd.DataFrame(data))
+
+    with patch("cleaner._transform._parsed_noms", {}) as memo:
+        add_parsed_nom_formation(mock_obj)
+        assert len(memo) == 5
+
+    assert mock_obj.df["niveau"].tolist() == ["Master 2", "Licence", "", "Master 2", "Master 2", "Licence"]
+    assert mock_obj.df["domaine"].tolist() == [
+        " Informatique ", " Math spécialité Analyse", "Diplôme Universitaire", " Informatique ", "\n", " "]
+    assert mock_obj.df["spécialisation"].tolist() == [" IA", " Analyse", "", " IA", "", " Info\n"]
+
+
+def test_parse_nom_formation_is_memoized():
+    noms = pd.Series(["Master Informatique Parcours IA", "Licence Math"])
+    memo = {"Master Informatique Parcours IA": ("cached", "cached", "cached")}
+    with patch("cleaner._transform._parsed_noms", memo):
+        parsed = parse_nom_formation(noms)
+
+    assert parsed.iloc[0].tolist() == ["cached", "cached", "cached"]
+    assert parsed.iloc[1].tolist() == ["Licence", " Math", ""]
+    assert list(memo) == ["Master Informatique Parcours IA", "Licence Math"]
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from datetime import datetime
 import os
@@ -25,3 +26,25 @@ else:
     logger.info("Run in server")
     date = datetime.strptime(os.environ["DATE_FOLDER"], '%Y-%m-%d')
     data_path = Path("/app/data/to_ingest")
+
+geocoding_cache_path = Path(os.environ.get(
+    "GEOCODING_CACHE_PATH", data_path / "cache" / "geocoding.sqlite"))
+geocoding_cache_ttl = float(os.environ.get("GEOCODING_CACHE_TTL_DAYS", 90)) * 86400
+geocoding_negative_ttl = float(os.environ.get("GEOCODING_NEGATIVE_TTL_DAYS", 7)) * 86400
+geocoding_url = os.environ.get("GEOCODING_URL", "https://api-adresse.data.gouv.fr/search/")
+geocoding_max_workers = int(os.environ.get("GEOCODING_MAX_WORKERS", 8))
+geocoding_timeout = float(os.environ.get("GEOCODING_TIMEOUT", 10))
+# Bundled commune tables, the latest pinned version by default
+communes_reference_dir = Path(__file__).parent.parent / "reference"
+communes_table_version = os.environ.get(
+    "COMMUNES_TABLE_VERSION",
+    max(json.loads((communes_reference_dir / "sources.json").read_text()), default=""))
+communes_table_path = os.environ.get("COMMUNES_TABLE_PATH")
+if communes_table_path is not None:
+    communes_table_path = Path(communes_table_path)
+elif communes_table_version:
+    communes_table_path = \
+        communes_reference_dir / f"communes_postal_codes_{communes_table_version}.csv.gz"
+# Cities are resolved offline first only once a commune table ships
+geocoding_mode = os.environ.get(
+    "GEOCODING_MODE", "offline" if communes_table_path is not None else "online")
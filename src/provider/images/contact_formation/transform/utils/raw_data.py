@@ -0,0 +1,44 @@
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pcsv
+
+logger = logging.getLogger(__name__)
+
+
+def read_raw_csv(path, arrow_cols: list = ()) -> pd.DataFrame:
+    """
+    Read a raw CSV with the multithreaded Arrow parser.
+
+    The `arrow_cols` string columns are kept Arrow-backed, so that the
+    cleaning stage runs their regexes in the Arrow kernels. The other columns
+    follow `pd.read_csv`: missing values are NaN, dates stay strings and
+    all-empty columns are float.
+
+    Args:
+        path (str | Path): Location of the CSV file.
+        arrow_cols (list, optional): Columns kept as Arrow strings.
+
+    Returns:
+        pd.DataFrame: The CSV content.
+    """
+    table = pcsv.read_csv(
+        path,
+        parse_options=pcsv.ParseOptions(newlines_in_values=True),
+        convert_options=pcsv.ConvertOptions(strings_can_be_null=True)
+    )
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type) or field.name in arrow_cols:
+            table = table.set_column(i, field.name, table[field.name].cast(pa.string()))
+        elif pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table[field.name].cast(pa.float64()))
+    arrow_cols = [c for c in arrow_cols if c in table.column_names]
+
+    df = table.drop_columns(arrow_cols).to_pandas()
+    objects = df.select_dtypes(object).columns
+    df[objects] = df[objects].where(df[objects].notna(), np.nan)
+    for col in arrow_cols:
+        df[col] = pd.arrays.ArrowStringArray(table[col])
+    logger.info(f"Read {len(df)} rows from {path}")
+    return df[table.column_names]